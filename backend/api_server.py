@@ -1,17 +1,32 @@
 import asyncio
-import json
-import subprocess
+import os
+import time
+import uuid
+import orjson
 import psutil
 import docker
 import websockets
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set
 from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse
+from pydantic import BaseModel
 import uvicorn
 
-app = FastAPI(title="Eryza Rental Server API", version="1.0.0")
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import WatchError
+except ImportError:
+    aioredis = None
+
+app = FastAPI(
+    title="Eryza Rental Server API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware to allow web dashboard access
 app.add_middleware(
@@ -22,10 +37,221 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global state
-connected_clients = set()
+# Compress larger JSON responses (stats with container and rental lists)
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# Per-worker state
+connected_clients: Dict[int, "ClientCtx"] = {}  # keyed by id(websocket)
 system_stats = {}
-rental_db = {}
+
+# Shared state across workers: rentals and broadcasts go through Redis when configured
+REDIS_URL = os.getenv("REDIS_URL")
+RENTALS_KEY = "rentals"
+RENTAL_SEQ_KEY = "rental_seq"
+BROADCAST_CHANNEL = "rental_updates"
+redis_client = aioredis.from_url(REDIS_URL) if (aioredis and REDIS_URL) else None
+
+# Short-lived stats cache shared by /api/stats, WebSocket clients and the broadcaster
+STATS_CACHE_TTL = 1.5  # seconds
+_stats_cache = {"t": 0.0, "v": None}
+_stats_lock = asyncio.Lock()
+
+# ZeroTier membership changes on the order of minutes, so poll it rarely.
+# zerotier-cli runs without sudo: add the service user to the zerotier-one group.
+ZEROTIER_NETWORK_ID = "363c67c55ad2489d"
+ZEROTIER_CACHE_TTL = 30  # seconds
+_zt_cache = {"t": 0.0, "v": None}
+
+# Fallback payloads, shared by every response (treat as read-only).
+# Plain dicts/tuples rather than MappingProxyType so orjson can serialize them.
+ZEROTIER_OFFLINE = {
+    "networkId": ZEROTIER_NETWORK_ID,
+    "status": "OFFLINE",
+    "ip": "Not connected",
+    "peers": 0
+}
+ZEROTIER_UNKNOWN = {
+    "networkId": ZEROTIER_NETWORK_ID,
+    "status": "UNKNOWN",
+    "ip": "Error checking",
+    "peers": 0
+}
+MOCK_CONTAINERS = (
+    {"name": "rental-dev", "status": "running", "ports": "3000:3000", "uptime": "2h 15m"},
+    {"name": "eryzaa-web", "status": "running", "ports": "5173:5173", "uptime": "2h 15m"}
+)
+
+# Minimum CPU/memory change (percentage points) that triggers a stats broadcast
+STATS_CHANGE_EPSILON = 1.0
+
+# Pending messages per WebSocket client before it is considered too slow
+CLIENT_QUEUE_SIZE = 64
+
+# Previous (idle, total) jiffies from /proc/stat, for CPU% deltas
+_last_cpu_times = None
+
+def _fast_stats() -> Dict[str, Any]:
+    """Read CPU, memory, disk and network usage straight from /proc (Linux)"""
+    global _last_cpu_times
+    
+    # CPU: busy share of jiffies since the previous read
+    with open('/proc/stat', 'rb') as f:
+        times = [int(x) for x in f.readline().split()[1:9]]
+    idle, total = times[3] + times[4], sum(times)
+    cpu = 0.0
+    if _last_cpu_times:
+        delta_total = total - _last_cpu_times[1]
+        if delta_total > 0:
+            cpu = round(100.0 * (1 - (idle - _last_cpu_times[0]) / delta_total), 1)
+    _last_cpu_times = (idle, total)
+    
+    # Memory: same definition as psutil (total - available) / total
+    meminfo = {}
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f:
+            key, value = line.split(b':', 1)
+            if key in (b'MemTotal', b'MemAvailable'):
+                meminfo[key] = int(value.split()[0])
+                if len(meminfo) == 2:
+                    break
+    mem_total = meminfo[b'MemTotal']
+    memory = round(100.0 * (mem_total - meminfo[b'MemAvailable']) / mem_total, 1)
+    
+    # Disk: same definition as psutil used / (used + available to non-root)
+    st = os.statvfs('/')
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    avail = st.f_bavail * st.f_frsize
+    disk = round(100.0 * used / (used + avail), 1) if used + avail else 0.0
+    
+    # Network: totals over all non-loopback interfaces
+    rx = tx = 0
+    with open('/proc/net/dev', 'rb') as f:
+        for line in f.readlines()[2:]:
+            name, data = line.split(b':', 1)
+            if name.strip() == b'lo':
+                continue
+            fields = data.split()
+            rx += int(fields[0])
+            tx += int(fields[8])
+    
+    return {"cpu": cpu, "memory": memory, "disk": disk, "network": {"rx": rx, "tx": tx}}
+
+def _psutil_stats() -> Dict[str, Any]:
+    """Portable fallback for hosts without /proc"""
+    memory = psutil.virtual_memory()
+    network = psutil.net_io_counters()
+    return {
+        "cpu": psutil.cpu_percent(interval=None),
+        "memory": memory.percent,
+        "disk": psutil.disk_usage('/').percent,
+        "network": {
+            "rx": network.bytes_recv,
+            "tx": network.bytes_sent
+        }
+    }
+
+# Prime the CPU counters so later non-blocking reads return a real delta
+try:
+    _fast_stats()
+    read_system_resources = _fast_stats
+except (OSError, ValueError, KeyError):
+    psutil.cpu_percent(interval=None)
+    read_system_resources = _psutil_stats
+
+# Boot time is fixed for the life of the process
+BOOT_TIME = psutil.boot_time()
+
+class RentalCreate(BaseModel):
+    client: str = "unknown@example.com"
+    duration: str = "1h"
+    gpu: str = "RTX 4090"
+
+class RentalUpdate(BaseModel):
+    client: Optional[str] = None
+    duration: Optional[str] = None
+    status: Optional[str] = None
+    gpu: Optional[str] = None
+
+@dataclass
+class ClientCtx:
+    """A connected WebSocket client and its outgoing message queue"""
+    websocket: WebSocket
+    queue: asyncio.Queue
+    writer: Optional[asyncio.Task] = None
+
+class RentalStore:
+    """Rental records, kept in a Redis hash (id -> JSON) so every worker sees them"""
+    
+    def __init__(self, redis=None):
+        self.redis = redis
+        self._local: Dict[str, Dict[str, Any]] = {}
+    
+    async def all(self) -> List[Dict[str, Any]]:
+        if self.redis:
+            return [orjson.loads(v) for v in await self.redis.hvals(RENTALS_KEY)]
+        return list(self._local.values())
+    
+    async def next_id(self) -> str:
+        """Allocate a rental id that is unique across workers and deletions"""
+        if self.redis:
+            return f"rent_{await self.redis.incr(RENTAL_SEQ_KEY):06d}"
+        return f"rent_{uuid.uuid4().hex[:10]}"
+    
+    async def get(self, rental_id: str) -> Optional[Dict[str, Any]]:
+        if self.redis:
+            raw = await self.redis.hget(RENTALS_KEY, rental_id)
+            return orjson.loads(raw) if raw else None
+        return self._local.get(rental_id)
+    
+    async def put(self, rental: Dict[str, Any]):
+        if self.redis:
+            await self.redis.hset(RENTALS_KEY, rental["id"], orjson.dumps(rental))
+        else:
+            self._local[rental["id"]] = rental
+    
+    async def update(self, rental_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge changes into an existing rental atomically; None if it does not exist
+        
+        Uses WATCH/MULTI so concurrent updates are not lost and an update racing a
+        delete cannot bring the rental back.
+        """
+        if self.redis:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(RENTALS_KEY)
+                        raw = await pipe.hget(RENTALS_KEY, rental_id)
+                        if raw is None:
+                            return None
+                        rental = orjson.loads(raw)
+                        rental.update(changes)
+                        pipe.multi()
+                        pipe.hset(RENTALS_KEY, rental_id, orjson.dumps(rental))
+                        await pipe.execute()
+                        return rental
+                    except WatchError:
+                        # The hash changed between read and write; retry on fresh data
+                        continue
+        rental = self._local.get(rental_id)
+        if rental is not None:
+            rental.update(changes)
+        return rental
+    
+    async def put_if_absent(self, rental: Dict[str, Any]):
+        if self.redis:
+            await self.redis.hsetnx(RENTALS_KEY, rental["id"], orjson.dumps(rental))
+        else:
+            self._local.setdefault(rental["id"], rental)
+    
+    async def delete(self, rental_id: str) -> Optional[Dict[str, Any]]:
+        if self.redis:
+            raw = await self.redis.hget(RENTALS_KEY, rental_id)
+            if raw is None or not await self.redis.hdel(RENTALS_KEY, rental_id):
+                return None
+            return orjson.loads(raw)
+        return self._local.pop(rental_id, None)
+
+rental_store = RentalStore(redis_client)
 
 class SystemMonitor:
     def __init__(self):
@@ -35,107 +261,106 @@ class SystemMonitor:
             print(f"Warning: Docker client failed to initialize: {e}")
             self.docker_client = None
     
-    def get_system_stats(self) -> Dict[str, Any]:
-        """Get comprehensive system statistics"""
-        # CPU and Memory
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+    async def get_system_stats(self) -> Dict[str, Any]:
+        """Get system statistics, sharing one result between concurrent callers"""
+        if _stats_cache["v"] and time.monotonic() - _stats_cache["t"] < STATS_CACHE_TTL:
+            return _stats_cache["v"]
         
-        # Network stats
-        network = psutil.net_io_counters()
+        async with _stats_lock:
+            # Another caller may have refreshed the cache while we waited
+            if _stats_cache["v"] and time.monotonic() - _stats_cache["t"] < STATS_CACHE_TTL:
+                return _stats_cache["v"]
+            
+            zerotier_status = await self.get_zerotier_status_async()
+            # /proc reads and Docker calls block, so keep them off the event loop
+            stats = await asyncio.to_thread(self._collect_system_stats, zerotier_status)
+            stats["activeRentals"] = await rental_store.all()
+            _stats_cache["v"] = stats
+            _stats_cache["t"] = time.monotonic()
+            return stats
+    
+    def _collect_system_stats(self, zerotier_status: Dict[str, Any]) -> Dict[str, Any]:
+        """Get comprehensive system statistics"""
+        # CPU, memory, disk and network (non-blocking: CPU is the delta since last call)
+        system_resources = read_system_resources()
         
-        # Docker containers
+        # Docker containers: one list call returning plain dicts, no per-container inspect
         containers = []
         try:
             if self.docker_client:
-                for container in self.docker_client.containers.list():
+                for container in self.docker_client.api.containers():
                     containers.append({
-                        "name": container.name,
-                        "status": container.status,
-                        "ports": str(container.ports) if container.ports else "",
-                        "uptime": self.get_container_uptime(container)
+                        "name": container["Names"][0].lstrip('/') if container.get("Names") else container["Id"][:12],
+                        "status": container.get("State", "unknown"),
+                        "ports": self._format_ports(container.get("Ports")),
+                        "uptime": container.get("Status", "Unknown")
                     })
         except Exception as e:
             print(f"Docker error: {e}")
             # Add mock data if Docker isn't available
-            containers = [
-                {"name": "rental-dev", "status": "running", "ports": "3000:3000", "uptime": "2h 15m"},
-                {"name": "eryzaa-web", "status": "running", "ports": "5173:5173", "uptime": "2h 15m"}
-            ]
-        
-        # ZeroTier status
-        zerotier_status = self.get_zerotier_status()
+            containers = MOCK_CONTAINERS
         
         return {
             "containers": containers,
             "zerotierStatus": zerotier_status,
-            "systemResources": {
-                "cpu": cpu_percent,
-                "memory": memory.percent,
-                "disk": disk.percent,
-                "network": {
-                    "rx": network.bytes_recv,
-                    "tx": network.bytes_sent
-                }
-            },
-            "activeRentals": list(rental_db.values()),
+            "systemResources": system_resources,
             "uptime": self.get_system_uptime(),
             "timestamp": datetime.now().isoformat()
         }
     
-    def get_container_uptime(self, container) -> str:
-        """Get container uptime"""
-        try:
-            created = container.attrs['Created']
-            # Parse creation time and calculate uptime
-            # This is simplified - in production you'd parse the ISO timestamp
-            return "Running"
-        except:
-            return "Unknown"
+    def _format_ports(self, ports) -> str:
+        """Format Docker API port bindings as 'public:private' pairs"""
+        if not ports:
+            return ""
+        return ", ".join(
+            f"{p['PublicPort']}:{p['PrivatePort']}" if p.get("PublicPort") else str(p.get("PrivatePort", ""))
+            for p in ports
+        )
     
-    def get_zerotier_status(self) -> Dict[str, Any]:
-        """Get ZeroTier network status"""
+    async def get_zerotier_status_async(self) -> Dict[str, Any]:
+        """Get ZeroTier network status (cached, without blocking the event loop)"""
+        if _zt_cache["v"] and time.monotonic() - _zt_cache["t"] < ZEROTIER_CACHE_TTL:
+            return _zt_cache["v"]
+        
         try:
-            # Try to get ZeroTier status
-            result = subprocess.run(['sudo', 'zerotier-cli', 'listnetworks'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for line in lines[1:]:  # Skip header
-                    if '363c67c55ad2489d' in line:
-                        parts = line.split()
-                        return {
-                            "networkId": "363c67c55ad2489d",
-                            "status": "OK" if "OK" in line else "WAITING",
-                            "ip": parts[8].split('/')[0] if len(parts) > 8 and parts[8] != '-' else "Not assigned",
-                            "peers": 3  # Mock peer count
-                        }
-            
-            return {
-                "networkId": "363c67c55ad2489d",
-                "status": "OFFLINE",
-                "ip": "Not connected",
-                "peers": 0
-            }
+            proc = await asyncio.create_subprocess_exec(
+                'zerotier-cli', '-j', 'listnetworks',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=5)
+            status = self._parse_zerotier_networks(proc.returncode, stdout)
+        except asyncio.TimeoutError:
+            # Don't leave a hung zerotier-cli behind; kill and reap it
+            proc.kill()
+            await proc.wait()
+            status = ZEROTIER_UNKNOWN
         except Exception:
-            return {
-                "networkId": "363c67c55ad2489d",
-                "status": "UNKNOWN",
-                "ip": "Error checking",
-                "peers": 0
-            }
+            status = ZEROTIER_UNKNOWN
+        
+        _zt_cache["v"] = status
+        _zt_cache["t"] = time.monotonic()
+        return status
+    
+    def _parse_zerotier_networks(self, returncode: int, output: bytes) -> Dict[str, Any]:
+        """Parse `zerotier-cli -j listnetworks` output for our network"""
+        if returncode == 0:
+            for network in orjson.loads(output):
+                if network.get("nwid") == ZEROTIER_NETWORK_ID:
+                    addresses = network.get("assignedAddresses") or []
+                    return {
+                        "networkId": ZEROTIER_NETWORK_ID,
+                        "status": "OK" if network.get("status") == "OK" else "WAITING",
+                        "ip": addresses[0].split('/')[0] if addresses else "Not assigned",
+                        "peers": 3  # Mock peer count
+                    }
+        
+        return ZEROTIER_OFFLINE
     
     def get_system_uptime(self) -> str:
         """Get system uptime"""
-        try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.readline().split()[0])
-            hours = int(uptime_seconds // 3600)
-            minutes = int((uptime_seconds % 3600) // 60)
-            return f"{hours}h {minutes}m"
-        except:
-            return "Unknown"
+        uptime_seconds = int(time.time() - BOOT_TIME)
+        return f"{uptime_seconds // 3600}h {(uptime_seconds % 3600) // 60}m"
 
 monitor = SystemMonitor()
 
@@ -146,26 +371,26 @@ async def root():
 @app.get("/api/stats")
 async def get_stats():
     """Get current system statistics"""
-    return monitor.get_system_stats()
+    return await monitor.get_system_stats()
 
 @app.get("/api/rentals")
 async def get_rentals():
     """Get all rental information"""
-    return list(rental_db.values())
+    return await rental_store.all()
 
 @app.post("/api/rentals")
-async def create_rental(rental_data: dict):
+async def create_rental(rental_data: RentalCreate):
     """Create a new rental"""
-    rental_id = f"rent_{len(rental_db) + 1:03d}"
+    rental_id = await rental_store.next_id()
     rental = {
         "id": rental_id,
-        "client": rental_data.get("client", "unknown@example.com"),
-        "duration": rental_data.get("duration", "1h"),
+        "client": rental_data.client,
+        "duration": rental_data.duration,
         "status": "pending",
-        "gpu": rental_data.get("gpu", "RTX 4090"),
-        "created_at": datetime.now().isoformat()
+        "gpu": rental_data.gpu,
+        "created_at": int(time.time())
     }
-    rental_db[rental_id] = rental
+    await rental_store.put(rental)
     
     # Broadcast update to connected clients
     await broadcast_update({"type": "rental_created", "data": rental})
@@ -173,131 +398,240 @@ async def create_rental(rental_data: dict):
     return rental
 
 @app.put("/api/rentals/{rental_id}")
-async def update_rental(rental_id: str, rental_data: dict):
+async def update_rental(rental_id: str, rental_data: RentalUpdate):
     """Update rental status"""
-    if rental_id not in rental_db:
+    rental = await rental_store.update(rental_id, rental_data.model_dump(exclude_unset=True))
+    if rental is None:
         raise HTTPException(status_code=404, detail="Rental not found")
     
-    rental_db[rental_id].update(rental_data)
-    
     # Broadcast update to connected clients
-    await broadcast_update({"type": "rental_updated", "data": rental_db[rental_id]})
+    await broadcast_update({"type": "rental_updated", "data": rental})
     
-    return rental_db[rental_id]
+    return rental
 
 @app.delete("/api/rentals/{rental_id}")
 async def delete_rental(rental_id: str):
     """Delete/complete a rental"""
-    if rental_id not in rental_db:
+    rental = await rental_store.delete(rental_id)
+    if rental is None:
         raise HTTPException(status_code=404, detail="Rental not found")
     
-    rental = rental_db.pop(rental_id)
-    
     # Broadcast update to connected clients
     await broadcast_update({"type": "rental_deleted", "data": rental})
     
     return {"message": "Rental deleted", "rental": rental}
 
+async def _cmd_status():
+    return await monitor.get_system_stats()
+
+async def _cmd_restart():
+    return "Restart command received - would restart services"
+
+async def _cmd_logs():
+    try:
+        if monitor.docker_client:
+            # Docker log requests are blocking HTTP calls
+            return await asyncio.to_thread(_read_container_logs)
+        return ["Docker not available - showing mock logs",
+                "[2024-01-15 14:30:15] Rental server started",
+                "[2024-01-15 14:32:22] API endpoints initialized",
+                "[2024-01-15 14:35:10] ZeroTier connection established"]
+    except Exception:
+        return ["Error retrieving logs"]
+
+def _read_container_logs() -> List[str]:
+    """Get recent Docker logs"""
+    logs = []
+    for container in monitor.docker_client.containers.list():
+        recent_logs = container.logs(tail=5).decode('utf-8')
+        logs.append(f"=== {container.name} ===")
+        logs.extend(recent_logs.split('\n')[-5:])
+    return logs
+
+COMMANDS = {
+    "status": _cmd_status,
+    "restart": _cmd_restart,
+    "logs": _cmd_logs,
+}
+
 @app.post("/api/command")
 async def execute_command(command_data: dict):
     """Execute system commands safely"""
     command = command_data.get("command", "").lower().strip()
     
-    if command == "status":
-        return {"output": monitor.get_system_stats()}
-    elif command == "restart":
-        return {"output": "Restart command received - would restart services"}
-    elif command == "logs":
-        try:
-            # Get recent Docker logs
-            logs = []
-            if self.docker_client:
-                for container in self.docker_client.containers.list():
-                    recent_logs = container.logs(tail=5).decode('utf-8')
-                    logs.append(f"=== {container.name} ===")
-                    logs.extend(recent_logs.split('\n')[-5:])
-            else:
-                logs = ["Docker not available - showing mock logs",
-                       "[2024-01-15 14:30:15] Rental server started",
-                       "[2024-01-15 14:32:22] API endpoints initialized",
-                       "[2024-01-15 14:35:10] ZeroTier connection established"]
-            return {"output": logs}
-        except:
-            return {"output": ["Error retrieving logs"]}
-    else:
+    handler = COMMANDS.get(command)
+    if handler is None:
         return {"output": [f"Command not supported: {command}"]}
+    return {"output": await handler()}
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
     await websocket.accept()
-    connected_clients.add(websocket)
+    client = ClientCtx(websocket, asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE))
+    client.writer = asyncio.create_task(client_writer(client))
+    connected_clients[id(websocket)] = client
+    queue = client.queue
     
     try:
         # Send initial data
-        stats = monitor.get_system_stats()
-        await websocket.send_text(json.dumps({"type": "stats", "data": stats}))
+        stats = await monitor.get_system_stats()
+        await queue.put(orjson.dumps({"type": "stats", "data": stats}))
         
         # Keep connection alive and handle incoming messages
         async for message in websocket.iter_text():
             try:
-                data = json.loads(message)
+                data = orjson.loads(message)
                 if data.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    await queue.put(orjson.dumps({"type": "pong"}))
                 elif data.get("type") == "get_stats":
-                    stats = monitor.get_system_stats()
-                    await websocket.send_text(json.dumps({"type": "stats", "data": stats}))
-            except json.JSONDecodeError:
+                    stats = await monitor.get_system_stats()
+                    await queue.put(orjson.dumps({"type": "stats", "data": stats}))
+            except orjson.JSONDecodeError:
                 pass
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
-        connected_clients.discard(websocket)
+        connected_clients.pop(id(websocket), None)
+        client.writer.cancel()
+
+async def client_writer(client: ClientCtx):
+    """Drain one client's outgoing queue so a slow socket only delays itself"""
+    try:
+        while True:
+            payload = await client.queue.get()
+            await client.websocket.send_bytes(payload)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"WebSocket send error: {e}")
+        connected_clients.pop(id(client.websocket), None)
+        try:
+            await client.websocket.close()
+        except Exception:
+            pass  # Socket is already gone
 
 async def broadcast_update(message: dict):
-    """Broadcast updates to all connected WebSocket clients"""
-    if connected_clients:
-        disconnected = []
-        for client in connected_clients:
-            try:
-                await client.send_text(json.dumps(message))
-            except:
-                disconnected.append(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            connected_clients.discard(client)
+    """Broadcast updates to WebSocket clients on every worker"""
+    payload = orjson.dumps(message)
+    if redis_client:
+        # Each worker's relay_broadcasts task delivers it to its own clients
+        await redis_client.publish(BROADCAST_CHANNEL, payload)
+    else:
+        deliver_to_local_clients(payload)
+
+# Close handshakes for dropped clients, referenced until they finish
+_closing: Set[asyncio.Task] = set()
+
+async def _close_quietly(websocket: WebSocket, code: int):
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+def deliver_to_local_clients(payload: bytes):
+    """Queue an encoded message for every client connected to this worker"""
+    # Each client's writer task sends the shared buffer
+    for key, client in list(connected_clients.items()):
+        try:
+            client.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Client can't keep up; drop it rather than buffer without bound
+            connected_clients.pop(key, None)
+            client.writer.cancel()
+            task = asyncio.create_task(_close_quietly(client.websocket, 1013))
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+
+async def relay_broadcasts():
+    """Forward messages published by any worker to this worker's clients"""
+    while True:
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(BROADCAST_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    deliver_to_local_clients(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Broadcast relay error: {e}")
+            await asyncio.sleep(1)
+
+def stats_changed(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> bool:
+    """Whether stats moved enough since the last broadcast to be worth sending"""
+    if previous is None:
+        return True
+    prev_res, cur_res = previous["systemResources"], current["systemResources"]
+    return (
+        abs(cur_res["cpu"] - prev_res["cpu"]) >= STATS_CHANGE_EPSILON
+        or abs(cur_res["memory"] - prev_res["memory"]) >= STATS_CHANGE_EPSILON
+        or len(current["containers"]) != len(previous["containers"])
+        or current["zerotierStatus"] != previous["zerotierStatus"]
+    )
 
 async def periodic_stats_broadcast():
-    """Periodically broadcast system stats to connected clients"""
+    """Periodically broadcast system stats to connected clients when they change"""
+    last_sent_stats = None
     while True:
         try:
-            await asyncio.sleep(5)  # Update every 5 seconds
-            if connected_clients:
-                stats = monitor.get_system_stats()
-                await broadcast_update({"type": "stats", "data": stats})
+            await asyncio.sleep(5)  # Check every 5 seconds
+            if not connected_clients:
+                continue
+            stats = await monitor.get_system_stats()
+            if not stats_changed(last_sent_stats, stats):
+                continue
+            # Stats are per host, so every worker pushes them to its own clients only
+            deliver_to_local_clients(orjson.dumps({"type": "stats", "data": stats}))
+            last_sent_stats = stats
         except Exception as e:
             print(f"Periodic broadcast error: {e}")
 
-# Initialize some mock rental data
-rental_db["rent_001"] = {
-    "id": "rent_001",
-    "client": "user@example.com",
-    "duration": "2h 30m",
-    "status": "active",
-    "gpu": "RTX 4090",
-    "created_at": datetime.now().isoformat()
-}
+# Initialize some mock rental data (created_at is a Unix timestamp in seconds)
+_now = int(time.time())
+MOCK_RENTALS = [
+    {
+        "id": "rent_001",
+        "client": "user@example.com",
+        "duration": "2h 30m",
+        "status": "active",
+        "gpu": "RTX 4090",
+        "created_at": _now
+    },
+    {
+        "id": "rent_002",
+        "client": "client@test.com",
+        "duration": "45m",
+        "status": "pending",
+        "gpu": "RTX 3080",
+        "created_at": _now
+    }
+]
 
-rental_db["rent_002"] = {
-    "id": "rent_002",
-    "client": "client@test.com",
-    "duration": "45m",
-    "status": "pending",
-    "gpu": "RTX 3080",
-    "created_at": datetime.now().isoformat()
-}
+@app.on_event("startup")
+async def startup():
+    for rental in MOCK_RENTALS:
+        await rental_store.put_if_absent(rental)
+    app.state.stats_task = asyncio.create_task(periodic_stats_broadcast())
+    if redis_client:
+        app.state.relay_task = asyncio.create_task(relay_broadcasts())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.stats_task.cancel()
+    if redis_client:
+        app.state.relay_task.cancel()
+        await redis_client.aclose()
 
 if __name__ == "__main__":
-    # Run the server
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Single-process dev server. Production runs multiple workers via
+    # start_api_server.sh with REDIS_URL set so rentals and broadcasts are shared.
+    # Run the server on uvloop + httptools (fails loudly if the extras are missing)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
@@ -1,20 +1,29 @@
 import asyncio
-import json
-import subprocess
+import os
+import orjson
+import time
 import psutil
-import docker
+import aiodocker
 import websockets
 import aiohttp
-from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 from fastapi import FastAPI, WebSocket, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 import uvicorn
-from web3 import Web3
+from web3 import Web3, AsyncWeb3, AsyncHTTPProvider
+from web3._utils.abi import get_abi_output_types
+from eth_abi import encode as abi_encode
 from eth_account import Account
 
-app = FastAPI(title="Eryza Rental Server API", version="1.0.0")
+app = FastAPI(
+    title="Eryza Rental Server API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # CORS middleware to allow web dashboard access
 app.add_middleware(
@@ -108,14 +117,172 @@ TOKEN_ABI = [
     }
 ]
 
+# Multicall3 is deployed at the same address on Avalanche C-Chain (and most EVM chains)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {"type": "bool", "name": "requireSuccess"},
+            {"type": "tuple[]", "name": "calls", "components": [
+                {"type": "address", "name": "target"},
+                {"type": "bytes", "name": "callData"}
+            ]}
+        ],
+        "name": "tryAggregate",
+        "outputs": [{"type": "tuple[]", "name": "returnData", "components": [
+            {"type": "bool", "name": "success"},
+            {"type": "bytes", "name": "returnData"}
+        ]}],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+NODE_TYPES = ["ssh", "training", "edge", "inference"]
+
+def _output_types(abi: List[Dict], fn_name: str) -> List[str]:
+    return get_abi_output_types(next(entry for entry in abi if entry.get("name") == fn_name))
+
+# Output types resolved from the ABI once, so raw return data is decoded without the contract dispatcher
+NODE_IDS_TYPES = _output_types(MARKETPLACE_ABI, "getAvailableNodes")
+NODE_INFO_TYPES = _output_types(MARKETPLACE_ABI, "getNodeInfo")
+JOB_INFO_TYPES = _output_types(MARKETPLACE_ABI, "getJobInfo")
+
+# getAvailableNodes is only ever called with the fixed node types, so its calldata is baked once
+SELECTOR_GET_AVAILABLE_NODES = Web3.keccak(text="getAvailableNodes(string)")[:4]
+CALLDATA_GET_AVAILABLE_NODES = {
+    ntype: "0x" + (SELECTOR_GET_AVAILABLE_NODES + abi_encode(["string"], [ntype])).hex()
+    for ntype in NODE_TYPES
+}
+
+# Reads are cached for about one block so bursts of identical calls never reach the RPC node
+CACHE_TTL = 1.0
+CACHE_MAX_ENTRIES = 1024
+# Jobs in these statuses are immutable on-chain, so they are cached without a TTL; the
+# least recently read are evicted past JOB_CACHE_MAX_ENTRIES
+TERMINAL_JOB_STATUSES = frozenset({"Completed", "Cancelled"})
+JOB_CACHE_MAX_ENTRIES = 4096
+# ZeroTier membership changes on a scale of seconds, so zerotier-cli is not forked per request
+ZEROTIER_CACHE_TTL = 5.0
+
+@dataclass(slots=True)
+class NodeRecord:
+    """Compute node as served to clients; field names are the JSON keys"""
+    id: int
+    provider: str
+    nodeType: str
+    cpuCores: int
+    memoryGB: int
+    gpuCount: int
+    gpuType: str
+    pricePerHour: str
+    available: bool
+    totalJobs: int
+    successfulJobs: int
+    endpoint: str
+    reliability: float
+
+@dataclass(slots=True)
+class JobRecord:
+    """Marketplace job as served to clients; field names are the JSON keys"""
+    id: int
+    nodeId: int
+    client: str
+    provider: str
+    duration: int
+    totalCost: str
+    startTime: int
+    endTime: int
+    status: str
+    jobType: str
+    jobConfig: str
+    disputed: bool
+    disputer: str
+    disputeReason: str
+
+PONG_FRAME = orjson.dumps({"type": "pong"})
+
+STATS_BROADCAST_INTERVAL = 10  # Blockchain data does not change faster than this matters
+MAX_WS_CLIENTS = 500
+
+class ClientRegistry:
+    """Connected WebSocket clients behind an admission cap; connections over the cap wait for a slot"""
+    def __init__(self, cap: int):
+        self._clients = set()
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self._cap = cap
+    
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._cap)
+            self._active += 1
+    
+    async def release(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def set_cap(self, cap: int):
+        async with self._cond:
+            self._cap = cap
+            self._cond.notify_all()
+    
+    def add(self, websocket: WebSocket):
+        self._clients.add(websocket)
+    
+    def discard(self, websocket: WebSocket):
+        self._clients.discard(websocket)
+    
+    def __iter__(self):
+        return iter(self._clients)
+    
+    def __len__(self):
+        return len(self._clients)
+
 # Global state
-connected_clients = set()
+connected_clients = ClientRegistry(MAX_WS_CLIENTS)
 rental_db = {}
 
+# Latest full stats frame (sent on connect) and the delta frame pushed to subscribers
+# whenever _stats_event fires; _last_payload is the stats dict the delta is taken against.
+# _stats_seq numbers the deltas so a pusher that fell behind resends the full frame instead
+_latest_stats: Optional[bytes] = None
+_latest_delta: Optional[bytes] = None
+_latest_stats_at = 0.0
+_stats_seq = 0
+_last_payload: Dict[str, Any] = {}
+_stats_event = asyncio.Event()
+
+async def _singleflight(inflight: Dict[tuple, asyncio.Task], key: tuple, coro_factory) -> Any:
+    """Run coro_factory() once for concurrent callers of the same key; the others await its result
+    
+    The fetch runs as its own task and every caller awaits it through shield, so a
+    caller that is cancelled (e.g. its client disconnected) never cancels the others.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        inflight[key] = task
+        
+        def finished(done: asyncio.Task):
+            if inflight.get(key) is done:
+                del inflight[key]
+            if not done.cancelled():
+                done.exception()  # Mark retrieved in case every caller was cancelled
+        task.add_done_callback(finished)
+    return await asyncio.shield(task)
+
 class BlockchainService:
     def __init__(self):
+        # Contracts are built here; the RPC session is opened by connect() on app startup
+        self.connected = False
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._cache: Dict[tuple, tuple] = {}
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._job_cache: "OrderedDict[int, JobRecord]" = OrderedDict()
         try:
-            self.w3 = Web3(Web3.HTTPProvider(AVALANCHE_FUJI_RPC))
+            self.w3 = AsyncWeb3(AsyncHTTPProvider(AVALANCHE_FUJI_RPC, request_kwargs={"timeout": 10}))
             self.marketplace_contract = self.w3.eth.contract(
                 address=CONTRACT_ADDRESSES["COMPUTE_MARKETPLACE"], 
                 abi=MARKETPLACE_ABI
@@ -124,95 +291,250 @@ class BlockchainService:
                 address=CONTRACT_ADDRESSES["ERYZA_TOKEN"], 
                 abi=TOKEN_ABI
             )
-            self.connected = self.w3.is_connected()
-            print(f"Blockchain connection: {'✅ Connected' if self.connected else '❌ Failed'}")
+            self.multicall_contract = self.w3.eth.contract(
+                address=MULTICALL3_ADDRESS,
+                abi=MULTICALL3_ABI
+            )
         except Exception as e:
             print(f"Blockchain connection error: {e}")
-            self.connected = False
             self.w3 = None
             self.marketplace_contract = None
             self.token_contract = None
+            self.multicall_contract = None
+
+    async def connect(self):
+        """Open one keep-alive HTTP session shared by web3 and batch calls"""
+        if not self.w3:
+            return
+        try:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, limit_per_host=32),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+            await self.w3.provider.cache_async_session(self._http)
+            self.connected = await self.w3.is_connected()
+            print(f"Blockchain connection: {'✅ Connected' if self.connected else '❌ Failed'}")
+        except Exception as e:
+            print(f"Blockchain connection error: {e}")
+            self.connected = False
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._http:
+            await self._http.close()
+            self._http = None
+        self.connected = False
+
+    def _encode_call(self, fn_name: str, args: list) -> str:
+        """Calldata for a marketplace call, from the precomputed table when possible"""
+        if fn_name == "getAvailableNodes" and args[0] in CALLDATA_GET_AVAILABLE_NODES:
+            return CALLDATA_GET_AVAILABLE_NODES[args[0]]
+        return self.marketplace_contract.encodeABI(fn_name=fn_name, args=args)
+
+    async def _multicall(self, fn_name: str, args_list: List[list]) -> List[Optional[bytes]]:
+        """Run many marketplace view calls in one eth_call via Multicall3.tryAggregate
+        
+        Returns the raw return data per call, or None where that call reverted.
+        """
+        target = self.marketplace_contract.address
+        calls = [
+            (target, self._encode_call(fn_name, args))
+            for args in args_list
+        ]
+        results = await self.multicall_contract.functions.tryAggregate(False, calls).call()
+        return [data if success else None for success, data in results]
+
+    async def _cached_call(self, key: tuple, coro_factory, ttl: float = CACHE_TTL) -> Any:
+        """Return the cached result for key if younger than ttl, else await coro_factory() and store it
+        
+        Concurrent misses on the same key share a single in-flight fetch.
+        """
+        hit = self._cache.get(key)
+        now = time.monotonic()
+        if hit and now - hit[0] < ttl:
+            return hit[1]
+        
+        async def fetch():
+            value = await coro_factory()
+            if len(self._cache) >= CACHE_MAX_ENTRIES:
+                # Keys embed the block number, so old blocks' entries are never hit again
+                self._cache = {k: v for k, v in self._cache.items() if now - v[0] < ttl}
+            self._cache[key] = (time.monotonic(), value)
+            return value
+        
+        return await _singleflight(self._inflight, key, fetch)
+
+    async def _block_number(self) -> int:
+        """Latest block number, itself cached so cache keys cost at most one RPC per TTL"""
+        return await self._cached_call(("eth_blockNumber",), lambda: self.w3.eth.block_number)
+
+    async def _fetch_node_ids(self, node_types: List[str]) -> List[int]:
+        try:
+            node_ids = []
+            for data in await self._multicall("getAvailableNodes", [[ntype] for ntype in node_types]):
+                if data is not None:
+                    node_ids.extend(self.w3.codec.decode(NODE_IDS_TYPES, data)[0])
+            return node_ids
+        except Exception as e:
+            print(f"Multicall getAvailableNodes failed, falling back to JSON-RPC batch: {e}")
+            return await self._get_available_node_ids_batched(node_types)
+
+    async def _fetch_node_infos(self, node_ids: List[int]) -> List[tuple]:
+        try:
+            node_infos = []
+            for node_id, data in zip(node_ids, await self._multicall("getNodeInfo", [[nid] for nid in node_ids])):
+                if data is None:
+                    print(f"Error fetching node {node_id}: call reverted")
+                    continue
+                node_infos.append((node_id, self.w3.codec.decode(NODE_INFO_TYPES, data)[0]))
+            return node_infos
+        except Exception as e:
+            print(f"Multicall getNodeInfo failed, falling back to JSON-RPC batch: {e}")
+            return await self._get_node_infos_batched(node_ids)
 
-    async def get_available_nodes(self, node_type: str = "") -> List[Dict]:
+    async def get_available_nodes(self, node_type: str = "") -> List[NodeRecord]:
         """Get available compute nodes from blockchain"""
         if not self.connected:
             return self._get_mock_nodes()
-        
+        return await _singleflight(self._inflight, ("available_nodes", node_type), lambda: self._load_available_nodes(node_type))
+
+    async def _load_available_nodes(self, node_type: str) -> List[NodeRecord]:
         try:
-            if node_type:
-                node_ids = self.marketplace_contract.functions.getAvailableNodes(node_type).call()
-            else:
-                # Get all types
-                all_nodes = []
-                for ntype in ["ssh", "training", "edge", "inference"]:
-                    try:
-                        nodes = self.marketplace_contract.functions.getAvailableNodes(ntype).call()
-                        all_nodes.extend(nodes)
-                    except:
-                        continue
-                node_ids = all_nodes
+            block = await self._block_number()
+            node_types = tuple([node_type] if node_type else NODE_TYPES)
+            node_ids = await self._cached_call(
+                ("getAvailableNodes", node_types, block),
+                lambda: self._fetch_node_ids(list(node_types))
+            )
+            node_ids = tuple(node_ids[:10])  # Limit to avoid timeout
             
-            # Get detailed info for each node
-            nodes = []
-            for node_id in node_ids[:10]:  # Limit to avoid timeout
-                try:
-                    node_info = self.marketplace_contract.functions.getNodeInfo(node_id).call()
-                    nodes.append({
-                        "id": node_id,
-                        "provider": node_info[0],
-                        "nodeType": node_info[1],
-                        "cpuCores": node_info[2],
-                        "memoryGB": node_info[3],
-                        "gpuCount": node_info[4],
-                        "gpuType": node_info[5],
-                        "pricePerHour": str(self.w3.from_wei(node_info[6], 'ether')),
-                        "available": node_info[7],
-                        "totalJobs": node_info[8],
-                        "successfulJobs": node_info[9],
-                        "endpoint": node_info[10],
-                        "reliability": (node_info[9] / max(node_info[8], 1)) * 100  # Success rate
-                    })
-                except Exception as e:
-                    print(f"Error fetching node {node_id}: {e}")
-                    continue
+            # Get detailed info for all nodes in one round-trip
+            node_infos = await self._cached_call(
+                ("getNodeInfo", node_ids, block),
+                lambda: self._fetch_node_infos(list(node_ids))
+            )
             
-            return nodes
+            return [self._format_node(node_id, node_info) for node_id, node_info in node_infos]
         except Exception as e:
             print(f"Error fetching nodes from blockchain: {e}")
             return self._get_mock_nodes()
 
-    async def get_user_jobs(self, user_address: str) -> List[Dict]:
+    async def _batch_call(self, fn_name: str, args_list: List[list]) -> List[Optional[bytes]]:
+        """Send many marketplace eth_calls as one JSON-RPC batch (a single HTTP POST)
+        
+        Returns the raw return data per call, or None where that call failed.
+        """
+        target = self.marketplace_contract.address
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "eth_call",
+                "params": [{"to": target, "data": self._encode_call(fn_name, args)}, "latest"]
+            }
+            for i, args in enumerate(args_list)
+        ]
+        if not payload:
+            return []
+        
+        async with self._http.post(AVALANCHE_FUJI_RPC, json=payload) as resp:
+            replies = await resp.json()
+        
+        results = {reply.get("id"): reply.get("result") for reply in replies}
+        return [
+            bytes.fromhex(results[i][2:]) if results.get(i) else None
+            for i in range(len(payload))
+        ]
+
+    async def _get_available_node_ids_batched(self, node_types: List[str]) -> List[int]:
+        """JSON-RPC batch fallback when Multicall3 is unavailable"""
+        node_ids = []
+        for data in await self._batch_call("getAvailableNodes", [[ntype] for ntype in node_types]):
+            if data is not None:
+                node_ids.extend(self.w3.codec.decode(NODE_IDS_TYPES, data)[0])
+        return node_ids
+
+    async def _get_node_infos_batched(self, node_ids: List[int]) -> List[tuple]:
+        """JSON-RPC batch fallback when Multicall3 is unavailable"""
+        node_infos = []
+        for node_id, data in zip(node_ids, await self._batch_call("getNodeInfo", [[nid] for nid in node_ids])):
+            if data is None:
+                print(f"Error fetching node {node_id}: call failed")
+                continue
+            node_infos.append((node_id, self.w3.codec.decode(NODE_INFO_TYPES, data)[0]))
+        return node_infos
+
+    def _format_node(self, node_id: int, node_info) -> NodeRecord:
+        return NodeRecord(
+            id=node_id,
+            provider=node_info[0],
+            nodeType=node_info[1],
+            cpuCores=node_info[2],
+            memoryGB=node_info[3],
+            gpuCount=node_info[4],
+            gpuType=node_info[5],
+            pricePerHour=str(self.w3.from_wei(node_info[6], 'ether')),
+            available=node_info[7],
+            totalJobs=node_info[8],
+            successfulJobs=node_info[9],
+            endpoint=node_info[10],
+            reliability=(node_info[9] / max(node_info[8], 1)) * 100  # Success rate
+        )
+
+    async def get_user_jobs(self, user_address: str) -> List[JobRecord]:
         """Get user's jobs from blockchain"""
         if not self.connected or not user_address:
             return self._get_mock_jobs()
         
         try:
-            job_ids = self.marketplace_contract.functions.getClientJobs(user_address).call()
+            block = await self._block_number()
+            job_ids = await self._cached_call(
+                ("getClientJobs", user_address, block),
+                self.marketplace_contract.functions.getClientJobs(user_address).call
+            )
+            job_ids = job_ids[-20:]  # Get last 20 jobs
             
-            jobs = []
-            for job_id in job_ids[-20:]:  # Get last 20 jobs
-                try:
-                    job_info = self.marketplace_contract.functions.getJobInfo(job_id).call()
-                    jobs.append({
-                        "id": job_id,
-                        "nodeId": job_info[0],
-                        "client": job_info[1],
-                        "provider": job_info[2],
-                        "duration": job_info[3],
-                        "totalCost": str(self.w3.from_wei(job_info[4], 'ether')),
-                        "startTime": job_info[5],
-                        "endTime": job_info[6],
-                        "status": self._format_job_status(job_info[7]),
-                        "jobType": job_info[8],
-                        "jobConfig": job_info[9],
-                        "disputed": job_info[10],
-                        "disputer": job_info[11],
-                        "disputeReason": job_info[12],
-                    })
-                except Exception as e:
-                    print(f"Error fetching job {job_id}: {e}")
+            # Jobs in a terminal status never change again, so only the rest are re-read;
+            # cached hits are marked recently used before any eviction below
+            stale_ids = []
+            for jid in job_ids:
+                if jid in self._job_cache:
+                    self._job_cache.move_to_end(jid)
+                else:
+                    stale_ids.append(jid)
+            fetched = {}
+            for job_id, data in zip(stale_ids, await self._batch_call("getJobInfo", [[jid] for jid in stale_ids])):
+                if data is None:
+                    print(f"Error fetching job {job_id}: call failed")
                     continue
+                job_info = self.w3.codec.decode(JOB_INFO_TYPES, data)[0]
+                job = JobRecord(
+                    id=job_id,
+                    nodeId=job_info[0],
+                    client=job_info[1],
+                    provider=job_info[2],
+                    duration=job_info[3],
+                    totalCost=str(self.w3.from_wei(job_info[4], 'ether')),
+                    startTime=job_info[5],
+                    endTime=job_info[6],
+                    status=self._format_job_status(job_info[7]),
+                    jobType=job_info[8],
+                    jobConfig=job_info[9],
+                    disputed=job_info[10],
+                    disputer=job_info[11],
+                    disputeReason=job_info[12],
+                )
+                if job.status in TERMINAL_JOB_STATUSES:
+                    self._job_cache[job_id] = job
+                    if len(self._job_cache) > JOB_CACHE_MAX_ENTRIES:
+                        self._job_cache.popitem(last=False)
+                fetched[job_id] = job
             
+            jobs = [
+                self._job_cache.get(jid) or fetched[jid]
+                for jid in job_ids
+                if jid in self._job_cache or jid in fetched
+            ]
             return jobs
         except Exception as e:
             print(f"Error fetching jobs from blockchain: {e}")
@@ -224,7 +546,11 @@ class BlockchainService:
             return {"balance": "0", "symbol": "ERYZA"}
         
         try:
-            balance = self.token_contract.functions.balanceOf(address).call()
+            block = await self._block_number()
+            balance = await self._cached_call(
+                ("balanceOf", address, block),
+                self.token_contract.functions.balanceOf(address).call
+            )
             return {
                 "balance": str(self.w3.from_wei(balance, 'ether')),
                 "symbol": "ERYZA",
@@ -234,19 +560,15 @@ class BlockchainService:
             print(f"Error fetching token balance: {e}")
             return {"balance": "0", "symbol": "ERYZA"}
 
-    async def get_marketplace_stats(self) -> Dict:
-        """Get overall marketplace statistics"""
+    async def get_marketplace_stats(self, nodes: Optional[List[NodeRecord]] = None) -> Dict:
+        """Get overall marketplace statistics, from nodes if the caller already fetched them"""
+        if nodes is not None:
+            return self.compute_stats(nodes)
+        return await _singleflight(self._inflight, ("marketplace_stats",), self._load_marketplace_stats)
+
+    async def _load_marketplace_stats(self) -> Dict:
         try:
-            nodes = await self.get_available_nodes()
-            active_nodes = len([n for n in nodes if n["available"]])
-            total_jobs = sum(n["totalJobs"] for n in nodes)
-            
-            return {
-                "totalNodes": len(nodes),
-                "activeNodes": active_nodes,
-                "totalJobs": total_jobs,
-                "avgReliability": sum(n["reliability"] for n in nodes) / len(nodes) if nodes else 0
-            }
+            return self.compute_stats(await self.get_available_nodes())
         except Exception as e:
             print(f"Error fetching marketplace stats: {e}")
             return {
@@ -256,117 +578,146 @@ class BlockchainService:
                 "avgReliability": 95.5
             }
 
+    @staticmethod
+    def compute_stats(nodes: List[NodeRecord]) -> Dict:
+        """Marketplace statistics from an already-fetched node list, in a single pass"""
+        active_nodes = 0
+        total_jobs = 0
+        reliability_sum = 0.0
+        for n in nodes:
+            active_nodes += n.available
+            total_jobs += n.totalJobs
+            reliability_sum += n.reliability
+        
+        return {
+            "totalNodes": len(nodes),
+            "activeNodes": active_nodes,
+            "totalJobs": total_jobs,
+            "avgReliability": reliability_sum / len(nodes) if nodes else 0
+        }
+
     def _format_job_status(self, status_code: int) -> str:
         statuses = ["Created", "Funded", "Started", "Completed", "Cancelled", "Disputed"]
         return statuses[status_code] if status_code < len(statuses) else "Unknown"
 
-    def _get_mock_nodes(self) -> List[Dict]:
+    def _get_mock_nodes(self) -> List[NodeRecord]:
         """Fallback mock data when blockchain is unavailable"""
         return [
-            {
-                "id": 1,
-                "provider": "0x742d35Cc6634C0532925a3b8D6C5db11A85d91B2",
-                "nodeType": "training",
-                "cpuCores": 32,
-                "memoryGB": 128,
-                "gpuCount": 4,
-                "gpuType": "RTX 4090",
-                "pricePerHour": "0.5",
-                "available": True,
-                "totalJobs": 25,
-                "successfulJobs": 24,
-                "endpoint": "192.168.194.76",
-                "reliability": 96.0
-            },
-            {
-                "id": 2,
-                "provider": "0x8ba1f109551bD432803012645Hac136c5db22f0",
-                "nodeType": "ssh",
-                "cpuCores": 16,
-                "memoryGB": 64,
-                "gpuCount": 2,
-                "gpuType": "RTX 3080",
-                "pricePerHour": "0.25",
-                "available": True,
-                "totalJobs": 18,
-                "successfulJobs": 17,
-                "endpoint": "192.168.194.32",
-                "reliability": 94.4
-            }
+            NodeRecord(
+                id=1,
+                provider="0x742d35Cc6634C0532925a3b8D6C5db11A85d91B2",
+                nodeType="training",
+                cpuCores=32,
+                memoryGB=128,
+                gpuCount=4,
+                gpuType="RTX 4090",
+                pricePerHour="0.5",
+                available=True,
+                totalJobs=25,
+                successfulJobs=24,
+                endpoint="192.168.194.76",
+                reliability=96.0
+            ),
+            NodeRecord(
+                id=2,
+                provider="0x8ba1f109551bD432803012645Hac136c5db22f0",
+                nodeType="ssh",
+                cpuCores=16,
+                memoryGB=64,
+                gpuCount=2,
+                gpuType="RTX 3080",
+                pricePerHour="0.25",
+                available=True,
+                totalJobs=18,
+                successfulJobs=17,
+                endpoint="192.168.194.32",
+                reliability=94.4
+            )
         ]
 
-    def _get_mock_jobs(self) -> List[Dict]:
+    def _get_mock_jobs(self) -> List[JobRecord]:
         """Fallback mock job data"""
         return [
-            {
-                "id": 1,
-                "nodeId": 1,
-                "client": "0x742d35Cc6634C0532925a3b8D6C5db11A85d91B2",
-                "provider": "0x8ba1f109551bD432803012645Hac136c5db22f0",
-                "duration": 4,
-                "totalCost": "2.0",
-                "startTime": int(datetime.now().timestamp()) - 3600,
-                "endTime": 0,
-                "status": "Started",
-                "jobType": "training",
-                "jobConfig": "ML model training job",
-                "disputed": False,
-                "disputer": "0x0000000000000000000000000000000000000000",
-                "disputeReason": ""
-            }
+            JobRecord(
+                id=1,
+                nodeId=1,
+                client="0x742d35Cc6634C0532925a3b8D6C5db11A85d91B2",
+                provider="0x8ba1f109551bD432803012645Hac136c5db22f0",
+                duration=4,
+                totalCost="2.0",
+                startTime=int(datetime.now().timestamp()) - 3600,
+                endTime=0,
+                status="Started",
+                jobType="training",
+                jobConfig="ML model training job",
+                disputed=False,
+                disputer="0x0000000000000000000000000000000000000000",
+                disputeReason=""
+            )
         ]
 
 class SystemMonitor:
     def __init__(self):
+        # The Docker client holds an aiohttp session, so it is opened by connect() on app startup
+        self.docker_client: Optional[aiodocker.Docker] = None
+        self.blockchain = BlockchainService()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._zt_cache: Optional[tuple] = None
+        # Prime the CPU counters so each later sample covers the time since the previous one
+        psutil.cpu_percent(interval=None)
+    
+    async def connect(self):
+        """Open the shared Docker socket session and the blockchain RPC session"""
         try:
-            self.docker_client = docker.from_env()
+            self.docker_client = aiodocker.Docker()
+            await self.docker_client.version()
         except Exception as e:
             print(f"Warning: Docker client failed to initialize: {e}")
+            if self.docker_client:
+                await self.docker_client.close()
             self.docker_client = None
-        
-        self.blockchain = BlockchainService()
+        await self.blockchain.connect()
+    
+    async def close(self):
+        if self.docker_client:
+            await self.docker_client.close()
+            self.docker_client = None
+        await self.blockchain.close()
     
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get comprehensive system statistics including blockchain data"""
-        # CPU and Memory
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Network stats
-        network = psutil.net_io_counters()
+        return await _singleflight(self._inflight, ("system_stats",), self._load_system_stats)
+    
+    async def _load_system_stats(self) -> Dict[str, Any]:
+        # Blockchain, ZeroTier and Docker are independent I/O, so run them concurrently
+        # Blocking psutil calls go to a worker thread so the event loop keeps serving clients
+        nodes_result, zerotier_status, containers, resources = await asyncio.gather(
+            self.blockchain.get_available_nodes(),
+            self.get_zerotier_status(),
+            self._list_containers(),
+            asyncio.to_thread(self._read_system_resources),
+            return_exceptions=True
+        )
+        if isinstance(resources, BaseException):
+            raise resources
+        cpu_percent, memory, disk, network = resources
         
-        # Docker containers
-        containers = []
-        try:
-            if self.docker_client:
-                for container in self.docker_client.containers.list():
-                    containers.append({
-                        "name": container.name,
-                        "status": container.status,
-                        "ports": str(container.ports) if container.ports else "",
-                        "uptime": self.get_container_uptime(container)
-                    })
-        except Exception as e:
-            print(f"Docker error: {e}")
+        if isinstance(containers, BaseException):
+            print(f"Docker error: {containers}")
             # Add mock data if Docker isn't available
             containers = [
                 {"name": "rental-dev", "status": "running", "ports": "3000:3000", "uptime": "2h 15m"},
                 {"name": "eryzaa-web", "status": "running", "ports": "5173:5173", "uptime": "2h 15m"}
             ]
         
-        # ZeroTier status
-        zerotier_status = self.get_zerotier_status()
-        
-        # Blockchain data
-        try:
-            marketplace_stats = await self.blockchain.get_marketplace_stats()
-            available_nodes = await self.blockchain.get_available_nodes()
-            active_rentals = [n for n in available_nodes if not n["available"]]  # Simplified
-        except Exception as e:
-            print(f"Blockchain data error: {e}")
+        # Blockchain data, summarized from the one node fetch
+        if isinstance(nodes_result, BaseException):
+            print(f"Blockchain data error: {nodes_result}")
             marketplace_stats = {"totalNodes": 0, "activeNodes": 0, "totalJobs": 0}
             active_rentals = []
+        else:
+            marketplace_stats = self.blockchain.compute_stats(nodes_result)
+            active_rentals = [n for n in nodes_result if not n.available]  # Simplified
         
         return {
             "containers": containers,
@@ -383,28 +734,79 @@ class SystemMonitor:
             "blockchainStats": marketplace_stats,
             "activeRentals": active_rentals[:5],  # Limit to 5 for display
             "uptime": self.get_system_uptime(),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "blockchainConnected": self.blockchain.connected
         }
     
-    def get_container_uptime(self, container) -> str:
-        """Get container uptime"""
+    def _read_system_resources(self) -> tuple:
+        """Sample CPU, memory, disk and network counters (blocking; called via a worker thread)"""
+        return (
+            psutil.cpu_percent(interval=None),  # Usage since the last sample, no sleep
+            psutil.virtual_memory(),
+            psutil.disk_usage('/'),
+            psutil.net_io_counters()
+        )
+    
+    async def _list_containers(self) -> List[Dict[str, Any]]:
+        """List running Docker containers over the shared Docker socket session"""
+        if not self.docker_client:
+            raise RuntimeError("Docker not available")
+        containers = await self.docker_client.containers.list()
+        details = await asyncio.gather(*(container.show() for container in containers))
+        return [
+            {
+                "name": info["Name"].lstrip("/"),
+                "status": info["State"]["Status"],
+                "ports": self._format_ports(container["Ports"]),
+                "uptime": self.get_container_uptime(info["State"].get("StartedAt"))
+            }
+            for container, info in zip(containers, details)
+        ]
+    
+    def _format_ports(self, ports) -> str:
+        """Format Docker API port bindings as 'public:private' pairs"""
+        if not ports:
+            return ""
+        return ", ".join(
+            f"{p['PublicPort']}:{p['PrivatePort']}" if p.get("PublicPort") else str(p.get("PrivatePort", ""))
+            for p in ports
+        )
+    
+    def get_container_uptime(self, started_at: Optional[str]) -> str:
+        """Get container uptime from its StartedAt timestamp"""
         try:
-            created = container.attrs['Created']
-            # Parse creation time and calculate uptime
-            # This is simplified - in production you'd parse the ISO timestamp
-            return "Running"
-        except:
+            # Docker reports nanosecond precision; seconds are enough here
+            started = datetime.strptime(started_at[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+            uptime_seconds = (datetime.now(timezone.utc) - started).total_seconds()
+            hours = int(uptime_seconds // 3600)
+            minutes = int((uptime_seconds % 3600) // 60)
+            return f"{hours}h {minutes}m"
+        except Exception:
             return "Unknown"
     
-    def get_zerotier_status(self) -> Dict[str, Any]:
-        """Get ZeroTier network status"""
+    async def get_zerotier_status(self) -> Dict[str, Any]:
+        """Get ZeroTier network status, re-probed at most every ZEROTIER_CACHE_TTL seconds"""
+        if self._zt_cache and time.monotonic() - self._zt_cache[0] < ZEROTIER_CACHE_TTL:
+            return self._zt_cache[1]
+        status = await self._probe_zerotier()
+        self._zt_cache = (time.monotonic(), status)
+        return status
+    
+    async def _probe_zerotier(self) -> Dict[str, Any]:
         try:
             # Try to get ZeroTier status
-            result = subprocess.run(['sudo', 'zerotier-cli', 'listnetworks'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
+            proc = await asyncio.create_subprocess_exec(
+                'sudo', 'zerotier-cli', 'listnetworks',
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=5)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            if proc.returncode == 0:
+                lines = stdout.decode().strip().split('\n')
                 for line in lines[1:]:  # Skip header
                     if '363c67c55ad2489d' in line:
                         parts = line.split()
@@ -449,17 +851,18 @@ async def root():
 @app.get("/api/stats")
 async def get_stats():
     """Get current system statistics"""
-    return await monitor.get_system_stats()
+    # Returned as a response directly so orjson encodes it without a jsonable_encoder pass
+    return ORJSONResponse(await monitor.get_system_stats())
 
 @app.get("/api/nodes")
 async def get_available_nodes(node_type: Optional[str] = None):
     """Get available compute nodes from blockchain"""
-    return await monitor.blockchain.get_available_nodes(node_type or "")
+    return ORJSONResponse(await monitor.blockchain.get_available_nodes(node_type or ""))
 
 @app.get("/api/jobs/{address}")
 async def get_user_jobs(address: str):
     """Get user's jobs from blockchain"""
-    return await monitor.blockchain.get_user_jobs(address)
+    return ORJSONResponse(await monitor.blockchain.get_user_jobs(address))
 
 @app.get("/api/balance/{address}")
 async def get_token_balance(address: str):
@@ -479,14 +882,14 @@ async def get_rentals():
         # Convert nodes to rental format for compatibility
         rentals = []
         for node in nodes:
-            if not node["available"] and node["totalJobs"] > 0:  # Active rental
+            if not node.available and node.totalJobs > 0:  # Active rental
                 rentals.append({
-                    "id": f"rent_{node['id']:03d}",
-                    "client": node["provider"][:10] + "...",
+                    "id": f"rent_{node.id:03d}",
+                    "client": node.provider[:10] + "...",
                     "duration": "2h 30m",  # Mock duration
                     "status": "active",
-                    "gpu": node["gpuType"],
-                    "nodeId": node["id"],
+                    "gpu": node.gpuType,
+                    "nodeId": node.id,
                     "created_at": datetime.now().isoformat()
                 })
         return rentals
@@ -503,7 +906,7 @@ async def execute_command(command_data: dict):
         return {"output": await monitor.get_system_stats()}
     elif command == "nodes":
         nodes = await monitor.blockchain.get_available_nodes()
-        return {"output": [f"Node {n['id']}: {n['nodeType']} - {n['gpuType']}" for n in nodes]}
+        return {"output": [f"Node {n.id}: {n.nodeType} - {n.gpuType}" for n in nodes]}
     elif command == "blockchain":
         return {"output": [
             f"Blockchain Status: {'Connected' if monitor.blockchain.connected else 'Disconnected'}",
@@ -518,10 +921,10 @@ async def execute_command(command_data: dict):
             # Get recent Docker logs
             logs = []
             if monitor.docker_client:
-                for container in monitor.docker_client.containers.list():
-                    recent_logs = container.logs(tail=5).decode('utf-8')
-                    logs.append(f"=== {container.name} ===")
-                    logs.extend(recent_logs.split('\n')[-5:])
+                for container in await monitor.docker_client.containers.list():
+                    recent_logs = await container.log(stdout=True, stderr=True, tail=5)
+                    logs.append(f"=== {container['Names'][0].lstrip('/')} ===")
+                    logs.extend(line.rstrip('\n') for line in recent_logs[-5:])
             else:
                 logs = ["Docker not available - showing mock logs",
                        "[2024-01-15 14:30:15] Rental server started",
@@ -534,61 +937,115 @@ async def execute_command(command_data: dict):
     else:
         return {"output": [f"Command not supported: {command}"]}
 
+async def publish_stats() -> bytes:
+    """Fetch stats once, store the full frame and push the changed sections to every subscriber"""
+    global _latest_stats, _latest_delta, _latest_stats_at, _last_payload, _stats_seq
+    stats = await monitor.get_system_stats()
+    changes = {key: value for key, value in stats.items() if _last_payload.get(key) != value}
+    _last_payload = stats
+    
+    # The timestamp always moves; only wake subscribers when something else changed
+    changed = bool(changes.keys() - {"timestamp"})
+    if changed:
+        _stats_seq += 1
+        _latest_delta = orjson.dumps({"type": "stats.delta", "seq": _stats_seq, "changes": changes})
+    _latest_stats = orjson.dumps({"type": "stats", "seq": _stats_seq, "data": stats})
+    _latest_stats_at = time.monotonic()
+    if changed:
+        _stats_event.set()
+        _stats_event.clear()
+    return _latest_stats
+
+async def current_stats_frame() -> bytes:
+    """Latest published stats frame, refreshed only if no publish happened within the interval"""
+    if _latest_stats is None or time.monotonic() - _latest_stats_at >= STATS_BROADCAST_INTERVAL:
+        return await publish_stats()
+    return _latest_stats
+
+async def push_stats(websocket: WebSocket, sent_seq: int):
+    """Forward each published stats delta to one client, which merges it into its last full frame
+    
+    sent_seq is the seq of the frame the client already has. A client that missed a delta
+    (slow send, or several publishes in between) gets the full frame instead.
+    """
+    while True:
+        if _stats_seq == sent_seq:
+            await _stats_event.wait()
+        seq = _stats_seq
+        frame = _latest_delta if seq == sent_seq + 1 else _latest_stats
+        sent_seq = seq
+        await websocket.send_bytes(frame)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
-    await websocket.accept()
-    connected_clients.add(websocket)
+    # Hold the handshake until a slot is free so reconnect storms cannot grow memory unbounded
+    await connected_clients.acquire()
+    pusher = None
     
     try:
-        # Send initial data
-        stats = await monitor.get_system_stats()
-        await websocket.send_text(json.dumps({"type": "stats", "data": stats}))
+        await websocket.accept()
+        connected_clients.add(websocket)
+        
+        # Send initial data from the shared frame, then follow the periodic publisher
+        frame = await current_stats_frame()
+        sent_seq = _stats_seq
+        await websocket.send_bytes(frame)
+        pusher = asyncio.create_task(push_stats(websocket, sent_seq))
         
         # Keep connection alive and handle incoming messages
         async for message in websocket.iter_text():
             try:
-                data = json.loads(message)
+                data = orjson.loads(message)
                 if data.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    await websocket.send_bytes(PONG_FRAME)
                 elif data.get("type") == "get_stats":
-                    stats = await monitor.get_system_stats()
-                    await websocket.send_text(json.dumps({"type": "stats", "data": stats}))
+                    await websocket.send_bytes(await current_stats_frame())
                 elif data.get("type") == "get_nodes":
                     nodes = await monitor.blockchain.get_available_nodes()
-                    await websocket.send_text(json.dumps({"type": "nodes", "data": nodes}))
-            except json.JSONDecodeError:
+                    await websocket.send_bytes(orjson.dumps({"type": "nodes", "data": nodes}))
+            except orjson.JSONDecodeError:
                 pass
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        if pusher:
+            pusher.cancel()
         connected_clients.discard(websocket)
-
-async def broadcast_update(message: dict):
-    """Broadcast updates to all connected WebSocket clients"""
-    if connected_clients:
-        disconnected = []
-        for client in connected_clients:
-            try:
-                await client.send_text(json.dumps(message))
-            except:
-                disconnected.append(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            connected_clients.discard(client)
+        await connected_clients.release()
 
 async def periodic_stats_broadcast():
-    """Periodically broadcast system stats to connected clients"""
+    """Periodically publish system stats to connected clients"""
     while True:
         try:
-            await asyncio.sleep(10)  # Update every 10 seconds for blockchain data
+            await asyncio.sleep(STATS_BROADCAST_INTERVAL)
             if connected_clients:
-                stats = await monitor.get_system_stats()
-                await broadcast_update({"type": "stats", "data": stats})
+                await publish_stats()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"Periodic broadcast error: {e}")
 
+@app.on_event("startup")
+async def startup():
+    await monitor.connect()
+    app.state.stats_task = asyncio.create_task(periodic_stats_broadcast())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.stats_task.cancel()
+    await monitor.close()
+
 if __name__ == "__main__":
-    # Run the server
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Run the server on uvloop + httptools with one worker per core. Caches, the stats
+    # publisher and the client registry are per worker; each worker serves its own clients.
+    uvicorn.run(
+        "api_server_blockchain:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        workers=int(os.getenv("API_WORKERS", os.cpu_count() or 1)),
+        log_level="info"
+    )
@@ -1,12 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
+from fastapi.responses import StreamingResponse
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import AsyncIterator, List, Optional
+from app.core.cache import cached_response, response_cache
+from app.core.database import get_async_db
 from app.models.models import Job, ComputeNode
 from app.schemas.jobs import JobResponse, JobStatus
 from app.schemas.nodes import NodeResponse, NodeStatus
 from pydantic import BaseModel
+import orjson
 from datetime import datetime
+import uuid
 
 router = APIRouter()
 
@@ -33,94 +39,146 @@ class RentalNodeResponse(BaseModel):
     pricing: dict
     last_seen: datetime
 
-@router.get("/active-jobs", response_model=List[ActiveJobResponse])
-async def get_active_jobs(db: Session = Depends(get_db)):
+# Cached responses invalidated whenever SSH access changes a job's state
+DISPLAY_CACHE_KEYS = ("active-jobs", "rental-nodes", "job-stats")
+
+UNKNOWN = "Unknown"
+
+# Rows fetched per database round-trip while streaming list responses
+STREAM_BATCH_SIZE = 200
+
+ACTIVE_JOB_STATUSES = [JobStatus.RUNNING.value, JobStatus.ACCEPTED.value]
+RENTAL_NODE_STATUSES = [NodeStatus.ACTIVE.value, NodeStatus.BUSY.value]
+
+# Statements are built once with expanding bind parameters so every request reuses
+# the same compiled SQL from the engine's statement cache
+_ACTIVE_JOBS_STMT = select(
+    Job.id, Job.client_id, Job.node_id, Job.ssh_username, Job.status,
+    Job.created_at, Job.expires_at, Job.payment_amount, ComputeNode.ip_address
+).join(ComputeNode, Job.node_id == ComputeNode.id, isouter=True).where(
+    Job.status.in_(bindparam("statuses", expanding=True))
+).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+_RENTAL_NODES_STMT = select(
+    ComputeNode.id, ComputeNode.ip_address, ComputeNode.zerotier_ip, ComputeNode.status,
+    ComputeNode.capabilities, ComputeNode.pricing, ComputeNode.last_seen
+).where(
+    ComputeNode.status.in_(bindparam("statuses", expanding=True))
+).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+_CURRENT_JOBS_STMT = select(Job.node_id, Job.id, Job.ssh_username).where(
+    Job.node_id.in_(bindparam("node_ids", expanding=True)),
+    Job.status.in_(bindparam("statuses", expanding=True))
+)
+
+_JOB_STATUS_COUNTS_STMT = select(Job.status, func.count()).group_by(Job.status)
+_NODE_STATUS_COUNTS_STMT = select(ComputeNode.status, func.count()).group_by(ComputeNode.status)
+
+async def _stream_json_array(items: AsyncIterator[dict]) -> StreamingResponse:
+    """Stream items as a JSON array, encoding each row as it is read from the cursor
+
+    The first row (and so the first batch) is read before returning, so query errors
+    surface in the caller and become a 500. An error after that can only truncate the
+    array, since the 200 status has already been sent.
+    """
+    first = await anext(items, None)
+    async def body():
+        if first is None:
+            yield b"[]"
+            return
+        yield b"[" + orjson.dumps(first)
+        async for item in items:
+            yield b"," + orjson.dumps(item)
+        yield b"]"
+    return StreamingResponse(body(), media_type="application/json")
+
+@router.get("/active-jobs", responses={200: {"model": List[ActiveJobResponse]}})
+@cached_response("active-jobs", expire=3)
+async def get_active_jobs(db: AsyncSession = Depends(get_async_db)):
     """Get all currently active jobs with rental node information"""
     
     try:
-        # Query active jobs with node information
-        jobs = db.query(Job).filter(
-            Job.status.in_([JobStatus.RUNNING, JobStatus.ACCEPTED])
-        ).all()
-        
-        active_jobs = []
-        for job in jobs:
-            # Get node information
-            node = db.query(ComputeNode).filter(
-                ComputeNode.id == job.node_id
-            ).first()
-            
-            job_response = ActiveJobResponse(
-                job_id=str(job.id),
-                client_id=str(job.client_id),
-                node_id=str(job.node_id) if job.node_id else "Unknown",
-                node_ip=node.ip_address if node else "Unknown",
-                ssh_username=job.ssh_username if hasattr(job, 'ssh_username') else None,
-                ssh_info=f"ssh {job.ssh_username}@{node.ip_address}" if (hasattr(job, 'ssh_username') and job.ssh_username and node) else None,
-                status=job.status.value,
-                created_at=job.created_at,
-                expires_at=job.expires_at if hasattr(job, 'expires_at') else None,
-                payment_amount=float(job.payment_amount) if job.payment_amount else None
-            )
-            active_jobs.append(job_response)
-        
-        return active_jobs
+        # Read only the displayed columns as plain rows, outer-joined to the node's IP;
+        # no ORM instances are hydrated for this read-only view
+        rows = await db.stream(_ACTIVE_JOBS_STMT, {"statuses": ACTIVE_JOB_STATUSES})
+        
+        # status is a String column, so rows already carry the plain value and the
+        # ssh_username column is always selected: no per-row enum or hasattr checks
+        async def active_jobs():
+            async for job_id, client_id, node_id, ssh_username, status, created_at, expires_at, payment_amount, node_ip in rows:
+                # Same fields as ActiveJobResponse
+                yield {
+                    "job_id": str(job_id),
+                    "client_id": str(client_id),
+                    "node_id": str(node_id) if node_id else UNKNOWN,
+                    "node_ip": node_ip or UNKNOWN,
+                    "ssh_username": ssh_username,
+                    "ssh_info": f"ssh {ssh_username}@{node_ip}" if (ssh_username and node_ip) else None,
+                    "status": status,
+                    "created_at": created_at,
+                    "expires_at": expires_at,
+                    "payment_amount": float(payment_amount) if payment_amount else None
+                }
+        
+        return await _stream_json_array(active_jobs())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve active jobs: {str(e)}")
 
-@router.get("/rental-nodes", response_model=List[RentalNodeResponse])
-async def get_rental_nodes(db: Session = Depends(get_db)):
+@router.get("/rental-nodes", responses={200: {"model": List[RentalNodeResponse]}})
+@cached_response("rental-nodes", expire=3)
+async def get_rental_nodes(db: AsyncSession = Depends(get_async_db)):
     """Get all available rental nodes with their current status"""
     
     try:
-        nodes = db.query(ComputeNode).filter(
-            ComputeNode.status.in_([NodeStatus.ACTIVE, NodeStatus.BUSY])
-        ).all()
-        
-        rental_nodes = []
-        for node in nodes:
-            # Check for current job
-            current_job = db.query(Job).filter(
-                Job.node_id == node.id,
-                Job.status.in_([JobStatus.RUNNING, JobStatus.ACCEPTED])
-            ).first()
-            
-            node_response = RentalNodeResponse(
-                node_id=str(node.id),
-                ip_address=node.ip_address,
-                zerotier_ip=node.zerotier_ip if hasattr(node, 'zerotier_ip') else None,
-                status=node.status.value,
-                current_job=str(current_job.id) if current_job else None,
-                ssh_user=current_job.ssh_username if (current_job and hasattr(current_job, 'ssh_username')) else None,
-                capabilities=node.capabilities if node.capabilities else {},
-                pricing=node.pricing if node.pricing else {},
-                last_seen=node.last_seen
-            )
-            rental_nodes.append(node_response)
-        
-        return rental_nodes
+        nodes = await db.stream(_RENTAL_NODES_STMT, {"statuses": RENTAL_NODE_STATUSES})
+        
+        async def rental_nodes():
+            async for batch in nodes.partitions():
+                # Fetch each batch's current jobs in one IN query rather than one query per node
+                current_by_node = {}
+                for job in await db.execute(_CURRENT_JOBS_STMT, {
+                    "node_ids": [node.id for node in batch],
+                    "statuses": ACTIVE_JOB_STATUSES
+                }):
+                    current_by_node.setdefault(job.node_id, job)
+                
+                for node in batch:
+                    current_job = current_by_node.get(node.id)
+                    # Same fields as RentalNodeResponse
+                    yield {
+                        "node_id": str(node.id),
+                        "ip_address": node.ip_address,
+                        "zerotier_ip": node.zerotier_ip,
+                        "status": node.status,
+                        "current_job": str(current_job.id) if current_job else None,
+                        "ssh_user": current_job.ssh_username if current_job else None,
+                        "capabilities": node.capabilities if node.capabilities else {},
+                        "pricing": node.pricing if node.pricing else {},
+                        "last_seen": node.last_seen
+                    }
+        
+        return await _stream_json_array(rental_nodes())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve rental nodes: {str(e)}")
 
 @router.get("/job-stats")
-async def get_job_statistics(db: Session = Depends(get_db)):
+@cached_response("job-stats", expire=5)
+async def get_job_statistics(db: AsyncSession = Depends(get_async_db)):
     """Get overall job and rental statistics"""
     
     try:
-        total_jobs = db.query(Job).count()
-        active_jobs = db.query(Job).filter(
-            Job.status.in_([JobStatus.RUNNING, JobStatus.ACCEPTED])
-        ).count()
-        
-        total_nodes = db.query(ComputeNode).count()
-        active_nodes = db.query(ComputeNode).filter(
-            ComputeNode.status == NodeStatus.ACTIVE
-        ).count()
-        busy_nodes = db.query(ComputeNode).filter(
-            ComputeNode.status == NodeStatus.BUSY
-        ).count()
+        # One GROUP BY per table instead of five separate COUNT queries
+        job_counts = dict((await db.execute(_JOB_STATUS_COUNTS_STMT)).all())
+        node_counts = dict((await db.execute(_NODE_STATUS_COUNTS_STMT)).all())
+        
+        total_jobs = sum(job_counts.values())
+        active_jobs = sum(job_counts.get(status, 0) for status in ACTIVE_JOB_STATUSES)
+        
+        total_nodes = sum(node_counts.values())
+        active_nodes = node_counts.get(NodeStatus.ACTIVE.value, 0)
+        busy_nodes = node_counts.get(NodeStatus.BUSY.value, 0)
         
         return {
             "jobs": {
@@ -140,11 +198,13 @@ async def get_job_statistics(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to retrieve statistics: {str(e)}")
 
 @router.post("/jobs/{job_id}/ssh-access")
-async def create_ssh_access(job_id: str, db: Session = Depends(get_db)):
+async def create_ssh_access(job_id: str, db: AsyncSession = Depends(get_async_db)):
     """Create SSH access for a job (called when payment is confirmed)"""
     
     try:
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = (await db.execute(
+            select(Job).options(load_only(Job.id, Job.node_id, Job.status, Job.ssh_username)).where(Job.id == job_id)
+        )).scalars().first()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
@@ -152,18 +212,20 @@ async def create_ssh_access(job_id: str, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Job must be accepted before creating SSH access")
         
         # Get node information
-        node = db.query(ComputeNode).filter(ComputeNode.id == job.node_id).first()
+        node = (await db.execute(
+            select(ComputeNode).options(load_only(ComputeNode.id, ComputeNode.ip_address)).where(ComputeNode.id == job.node_id)
+        )).scalars().first()
         if not node:
             raise HTTPException(status_code=404, detail="Node not found")
         
         # Generate SSH username (this would integrate with the SSH manager)
-        import uuid
-        ssh_username = f"job_{str(uuid.uuid4()).replace('-', '')[:8]}"
+        ssh_username = f"job_{uuid.uuid4().hex[:8]}"
         
         # Update job with SSH information
         job.ssh_username = ssh_username
         job.status = JobStatus.RUNNING
-        db.commit()
+        await db.commit()
+        await response_cache.invalidate(*DISPLAY_CACHE_KEYS)
         
         return {
             "job_id": str(job.id),
@@ -174,23 +236,26 @@ async def create_ssh_access(job_id: str, db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create SSH access: {str(e)}")
 
 @router.delete("/jobs/{job_id}/ssh-access")
-async def remove_ssh_access(job_id: str, db: Session = Depends(get_db)):
+async def remove_ssh_access(job_id: str, db: AsyncSession = Depends(get_async_db)):
     """Remove SSH access for a job (called when job ends)"""
     
     try:
-        job = db.query(Job).filter(Job.id == job_id).first()
+        job = (await db.execute(
+            select(Job).options(load_only(Job.id, Job.node_id, Job.status, Job.ssh_username)).where(Job.id == job_id)
+        )).scalars().first()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Remove SSH username and update status
-        ssh_username = job.ssh_username if hasattr(job, 'ssh_username') else None
+        ssh_username = job.ssh_username
         job.ssh_username = None
         job.status = JobStatus.COMPLETED
-        db.commit()
+        await db.commit()
+        await response_cache.invalidate(*DISPLAY_CACHE_KEYS)
         
         return {
             "job_id": str(job.id),
@@ -199,5 +264,5 @@ async def remove_ssh_access(job_id: str, db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to remove SSH access: {str(e)}")
@@ -5,11 +5,12 @@ Now integrated with Avalanche blockchain for real data
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Dict, List, Optional, Any
+from fastapi.responses import ORJSONResponse
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 import asyncio
-import json
 import logging
+import time
+import orjson
 from datetime import datetime
 
 # Import the real monitoring service
@@ -22,103 +23,138 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1/monitoring", tags=["monitoring"])
+router = APIRouter(prefix="/api/v1/monitoring", tags=["monitoring"], default_response_class=ORJSONResponse)
+
+BROADCAST_SEND_TIMEOUT = 2.0
+MAX_SUBSCRIBERS_PER_TOPIC = 1000
 
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.gpu_subscribers: Dict[str, List[WebSocket]] = {}
-        self.subnet_subscribers: Dict[str, List[WebSocket]] = {}
-        self.system_subscribers: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
+        # Every handler calls disconnect() on exit, which also drops emptied topics
+        self.gpu_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.subnet_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.system_subscribers: Set[WebSocket] = set()
+        # Reverse index: the GPU and subnet topics each connection joined
+        self._topics: Dict[WebSocket, Tuple[Set[str], Set[str]]] = {}
+        # /ws/multi connections -> (gpu_ids, subnet_ids, wants_system)
+        self.multi_subscribers: Dict[WebSocket, Tuple] = {}
+        # Close handshakes for dropped clients, referenced until they finish
+        self._closing: Set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        
-        # Remove from specific subscriptions
-        for gpu_id in list(self.gpu_subscribers.keys()):
-            if websocket in self.gpu_subscribers[gpu_id]:
-                self.gpu_subscribers[gpu_id].remove(websocket)
-                if not self.gpu_subscribers[gpu_id]:
-                    del self.gpu_subscribers[gpu_id]
+        self.active_connections.discard(websocket)
+        self.system_subscribers.discard(websocket)
+        self.multi_subscribers.pop(websocket, None)
         
-        for subnet_id in list(self.subnet_subscribers.keys()):
-            if websocket in self.subnet_subscribers[subnet_id]:
-                self.subnet_subscribers[subnet_id].remove(websocket)
-                if not self.subnet_subscribers[subnet_id]:
-                    del self.subnet_subscribers[subnet_id]
-        
-        if websocket in self.system_subscribers:
-            self.system_subscribers.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+        # Remove from the specific subscriptions this connection joined
+        gpu_ids, subnet_ids = self._topics.pop(websocket, ((), ()))
+        for gpu_id in gpu_ids:
+            self._unsubscribe(self.gpu_subscribers, gpu_id, websocket)
+        for subnet_id in subnet_ids:
+            self._unsubscribe(self.subnet_subscribers, subnet_id, websocket)
+
+    @staticmethod
+    def _unsubscribe(subscribers: Dict[str, Set[WebSocket]], topic: str, websocket: WebSocket):
+        subs = subscribers.get(topic)
+        if subs is not None:
+            subs.discard(websocket)
+            if not subs:
+                del subscribers[topic]
+
+    async def send_personal_message(self, message: bytes, websocket: WebSocket):
         try:
-            await websocket.send_text(message)
+            await websocket.send_bytes(message)
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+            self._drop(websocket, 1011)
+
+    async def _broadcast(self, subscribers: Iterable[WebSocket], message: bytes, kind: str):
+        """Send one pre-serialized payload to all subscribers concurrently"""
+        targets = list(subscribers)
+        # A client that cannot take the frame within the timeout is dropped like a failed one
+        results = await asyncio.gather(
+            *(asyncio.wait_for(websocket.send_bytes(message), timeout=BROADCAST_SEND_TIMEOUT) for websocket in targets),
+            return_exceptions=True
+        )
+        
+        # Remove disconnected websockets and close them so the client sees the drop and
+        # reconnects; a timed-out send may have left a partial frame on the wire
+        for ws, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to {kind} subscriber: {result!r}")
+                self._drop(ws, 1013 if isinstance(result, asyncio.TimeoutError) else 1011)
+
+    def _drop(self, websocket: WebSocket, code: int):
+        """Unsubscribe a failed client and close it in the background"""
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close_quietly(websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
 
-    async def broadcast_to_gpu_subscribers(self, gpu_id: str, message: str):
+    async def broadcast_to_gpu_subscribers(self, gpu_id: str, message: bytes):
         if gpu_id in self.gpu_subscribers:
-            disconnected = []
-            for websocket in self.gpu_subscribers[gpu_id]:
-                try:
-                    await websocket.send_text(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to GPU subscriber: {e}")
-                    disconnected.append(websocket)
-            
-            # Remove disconnected websockets
-            for ws in disconnected:
-                self.disconnect(ws)
+            await self._broadcast(self.gpu_subscribers[gpu_id], message, "GPU")
 
-    async def broadcast_to_subnet_subscribers(self, subnet_id: str, message: str):
+    async def broadcast_to_subnet_subscribers(self, subnet_id: str, message: bytes):
         if subnet_id in self.subnet_subscribers:
-            disconnected = []
-            for websocket in self.subnet_subscribers[subnet_id]:
-                try:
-                    await websocket.send_text(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to subnet subscriber: {e}")
-                    disconnected.append(websocket)
-            
-            # Remove disconnected websockets
-            for ws in disconnected:
-                self.disconnect(ws)
-
-    async def broadcast_to_system_subscribers(self, message: str):
-        disconnected = []
-        for websocket in self.system_subscribers:
-            try:
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to system subscriber: {e}")
-                disconnected.append(websocket)
-        
-        # Remove disconnected websockets
-        for ws in disconnected:
-            self.disconnect(ws)
-
-    def subscribe_to_gpu(self, websocket: WebSocket, gpu_id: str):
-        if gpu_id not in self.gpu_subscribers:
-            self.gpu_subscribers[gpu_id] = []
-        if websocket not in self.gpu_subscribers[gpu_id]:
-            self.gpu_subscribers[gpu_id].append(websocket)
-
-    def subscribe_to_subnet(self, websocket: WebSocket, subnet_id: str):
-        if subnet_id not in self.subnet_subscribers:
-            self.subnet_subscribers[subnet_id] = []
-        if websocket not in self.subnet_subscribers[subnet_id]:
-            self.subnet_subscribers[subnet_id].append(websocket)
-
-    def subscribe_to_system(self, websocket: WebSocket):
-        if websocket not in self.system_subscribers:
-            self.system_subscribers.append(websocket)
+            await self._broadcast(self.subnet_subscribers[subnet_id], message, "subnet")
+
+    async def broadcast_to_system_subscribers(self, message: bytes):
+        await self._broadcast(self.system_subscribers, message, "system")
+
+    def subscribe_to_gpu(self, websocket: WebSocket, gpu_id: str) -> bool:
+        """Subscribe to a GPU topic; False if the topic is at MAX_SUBSCRIBERS_PER_TOPIC"""
+        subs = self.gpu_subscribers.setdefault(gpu_id, set())
+        if len(subs) >= MAX_SUBSCRIBERS_PER_TOPIC:
+            return False
+        subs.add(websocket)
+        self._topics.setdefault(websocket, (set(), set()))[0].add(gpu_id)
+        return True
+
+    def subscribe_to_subnet(self, websocket: WebSocket, subnet_id: str) -> bool:
+        """Subscribe to a subnet topic; False if the topic is at MAX_SUBSCRIBERS_PER_TOPIC"""
+        subs = self.subnet_subscribers.setdefault(subnet_id, set())
+        if len(subs) >= MAX_SUBSCRIBERS_PER_TOPIC:
+            return False
+        subs.add(websocket)
+        self._topics.setdefault(websocket, (set(), set()))[1].add(subnet_id)
+        return True
+
+    def subscribe_to_system(self, websocket: WebSocket) -> bool:
+        """Subscribe to system metrics; False if already at MAX_SUBSCRIBERS_PER_TOPIC"""
+        if len(self.system_subscribers) >= MAX_SUBSCRIBERS_PER_TOPIC:
+            return False
+        self.system_subscribers.add(websocket)
+        return True
+
+    def subscribe_to_multi(self, websocket: WebSocket, gpu_ids: Tuple[str, ...],
+                           subnet_ids: Tuple[str, ...], system: bool) -> bool:
+        """Register a multiplexed subscription; False if at MAX_SUBSCRIBERS_PER_TOPIC"""
+        if len(self.multi_subscribers) >= MAX_SUBSCRIBERS_PER_TOPIC:
+            return False
+        self.multi_subscribers[websocket] = (gpu_ids, subnet_ids, system)
+        return True
+
+    async def broadcast_to_multi_subscribers(self, websockets: List[WebSocket], message: bytes):
+        await self._broadcast(websockets, message, "multiplexed")
+
+    async def reject(self, websocket: WebSocket):
+        """Close a connection that could not be subscribed (1013: try again later)"""
+        self.disconnect(websocket)
+        await websocket.close(code=1013)
 
 manager = ConnectionManager()
 
@@ -136,7 +172,7 @@ class MockMonitoringService:
                 "compute_power": 83.0,
                 "is_rented": True,
                 "current_subnet": "subnet_ml_training_001",
-                "last_updated": datetime.now().isoformat()
+                "last_updated": datetime.now()
             }
         }
     
@@ -157,7 +193,7 @@ class MockMonitoringService:
                 "avg_temperature": 72.0,
                 "total_power_draw": 700.0,
                 "active": True,
-                "created_at": datetime.now().isoformat(),
+                "created_at": datetime.now(),
                 "purpose": "ML Training"
             }
         }
@@ -172,68 +208,218 @@ class MockMonitoringService:
             "total_memory": 64.0,
             "avg_system_utilization": 45.2,
             "blockchain_connected": True,
-            "last_updated": datetime.now().isoformat()
+            "last_updated": datetime.now()
         }
+    
+    def get_gpu_health_counts(self):
+        counts = {"healthy": 0, "warning": 0, "critical": 0}
+        for gpu_data in self.mock_data.values():
+            temp = gpu_data.get("temperature", 0)
+            if temp > 90:
+                counts["critical"] += 1
+            elif temp > 85:
+                counts["warning"] += 1
+            else:
+                counts["healthy"] += 1
+        return counts
 
-# Mock monitoring service for demonstration
-class MockMonitoringService:
-    def __init__(self):
-        self.mock_data = {
-            "gpu_001": {
-                "gpu_id": "gpu_001",
-                "utilization": 85.5,
-                "temperature": 72.0,
-                "power_draw": 350.0,
-                "memory_used": 20.5,
-                "memory_total": 24.0,
-                "compute_power": 83.0,
-                "is_rented": True,
-                "current_subnet": "subnet_ml_training_001",
-                "last_updated": datetime.now().isoformat()
-            }
-        }
+METRICS_CACHE_TTL = 5.0
+METRICS_CACHE_MAX_ENTRIES = 256
+
+class CachedMonitoringService:
+    """Serves the metrics getters from a short TTL cache so bursts of REST and
+    WebSocket reads share one snapshot; everything else passes through"""
+    
+    def __init__(self, service, ttl: float = METRICS_CACHE_TTL):
+        self._service = service
+        self._ttl = ttl
+        self._cache: Dict[tuple, Tuple[float, Any]] = {}
+    
+    def _get(self, key: tuple, fetch) -> Any:
+        # The getters are synchronous, so concurrent misses cannot interleave and
+        # need no per-key lock to coalesce
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit and now - hit[0] < self._ttl:
+            return hit[1]
+        value = fetch()
+        # Keys include client-supplied ids, so the size is capped: expired entries go
+        # first, then the oldest (the dict is kept in insertion order)
+        self._cache.pop(key, None)
+        if len(self._cache) >= METRICS_CACHE_MAX_ENTRIES:
+            self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self._ttl}
+            while len(self._cache) >= METRICS_CACHE_MAX_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+        self._cache[key] = (now, value)
+        return value
+    
+    def get_system_metrics(self):
+        return self._get(("system",), self._service.get_system_metrics)
     
     def get_gpu_metrics(self, gpu_id: Optional[str] = None):
-        if gpu_id:
-            return self.mock_data.get(gpu_id, {})
-        return self.mock_data
+        return self._get(("gpu", gpu_id), lambda: self._service.get_gpu_metrics(gpu_id))
     
     def get_subnet_metrics(self, subnet_id: Optional[str] = None):
-        return {
-            "subnet_ml_training_001": {
-                "subnet_id": "subnet_ml_training_001",
-                "coordinator": "0x1234...5678",
-                "gpu_count": 2,
-                "total_compute": 166.0,
-                "total_memory": 48.0,
-                "avg_utilization": 85.5,
-                "avg_temperature": 72.0,
-                "total_power_draw": 700.0,
-                "active": True,
-                "created_at": datetime.now().isoformat(),
-                "purpose": "ML Training"
-            }
-        }
+        return self._get(("subnet", subnet_id), lambda: self._service.get_subnet_metrics(subnet_id))
     
-    def get_system_metrics(self):
-        return {
-            "total_gpus": 3,
-            "rented_gpus": 2,
-            "available_gpus": 1,
-            "active_subnets": 2,
-            "total_compute_power": 231.0,
-            "total_memory": 64.0,
-            "avg_system_utilization": 45.2,
-            "blockchain_connected": True,
-            "last_updated": datetime.now().isoformat()
-        }
+    def get_gpu_health_counts(self):
+        return self._get(("gpu_health",), self._service.get_gpu_health_counts)
+    
+    def __getattr__(self, name):
+        return getattr(self._service, name)
 
 # Use real monitoring service if available, otherwise fallback to mock
 if REAL_MONITORING_AVAILABLE and gpu_monitoring_service:
-    monitoring_service = gpu_monitoring_service
+    monitoring_service = CachedMonitoringService(gpu_monitoring_service)
 else:
     # Fallback to mock service for testing
-    monitoring_service = MockMonitoringService()
+    monitoring_service = CachedMonitoringService(MockMonitoringService())
+
+# ===== Broadcast Pollers =====
+
+SOURCE = "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock"
+SYSTEM_POLL_INTERVAL = 10
+GPU_POLL_INTERVAL = 5
+SUBNET_POLL_INTERVAL = 10
+
+def _system_message() -> bytes:
+    return orjson.dumps({
+        "type": "system_metrics",
+        "data": monitoring_service.get_system_metrics(),
+        "source": SOURCE,
+        "timestamp": datetime.now()
+    })
+
+def _gpu_message(gpu_id: str) -> Optional[bytes]:
+    gpu_metrics = monitoring_service.get_gpu_metrics(gpu_id)
+    if not gpu_metrics:
+        return None
+    return orjson.dumps({
+        "type": "gpu_metrics",
+        "gpu_id": gpu_id,
+        "data": gpu_metrics,
+        "source": SOURCE,
+        "timestamp": datetime.now()
+    })
+
+def _subnet_data(subnet_id: str) -> Any:
+    subnet_metrics = monitoring_service.get_subnet_metrics(subnet_id)
+    if not subnet_metrics:
+        return None
+    return subnet_metrics.get(subnet_id, {}) if isinstance(subnet_metrics, dict) else subnet_metrics
+
+def _subnet_message(subnet_id: str) -> Optional[bytes]:
+    subnet_data = _subnet_data(subnet_id)
+    if subnet_data is None:
+        return None
+    return orjson.dumps({
+        "type": "subnet_metrics",
+        "subnet_id": subnet_id,
+        "data": subnet_data,
+        "source": SOURCE,
+        "timestamp": datetime.now()
+    })
+
+def _multi_message(subscription: Tuple, gpus: Dict[str, Any], subnets: Dict[str, Any], system: Any) -> bytes:
+    """One frame carrying every topic of a multiplexed subscription"""
+    gpu_ids, subnet_ids, wants_system = subscription
+    message = {
+        "type": "multi_metrics",
+        "gpus": {gpu_id: gpus[gpu_id] for gpu_id in gpu_ids if gpus.get(gpu_id)},
+        "subnets": {subnet_id: subnets[subnet_id] for subnet_id in subnet_ids if subnets.get(subnet_id) is not None},
+        "source": SOURCE,
+        "timestamp": datetime.now()
+    }
+    if wants_system:
+        message["system"] = system
+    return orjson.dumps(message)
+
+def _fetch_multi_topics(subscriptions: Iterable[Tuple]) -> Tuple[Dict[str, Any], Dict[str, Any], Any]:
+    """Fetch the union of the requested topics, each once"""
+    gpu_ids: Set[str] = set()
+    subnet_ids: Set[str] = set()
+    wants_system = False
+    for sub_gpus, sub_subnets, sub_system in subscriptions:
+        gpu_ids.update(sub_gpus)
+        subnet_ids.update(sub_subnets)
+        wants_system = wants_system or sub_system
+    gpus = {gpu_id: monitoring_service.get_gpu_metrics(gpu_id) for gpu_id in gpu_ids}
+    subnets = {subnet_id: _subnet_data(subnet_id) for subnet_id in subnet_ids}
+    system = monitoring_service.get_system_metrics() if wants_system else None
+    return gpus, subnets, system
+
+async def system_poller():
+    """Fetch system metrics once per tick and broadcast them to every system subscriber"""
+    while True:
+        await asyncio.sleep(SYSTEM_POLL_INTERVAL)
+        try:
+            if manager.system_subscribers:
+                await manager.broadcast_to_system_subscribers(_system_message())
+        except Exception as e:
+            logger.error(f"System metrics poller error: {e}")
+
+async def gpu_poller():
+    """Fetch each subscribed GPU's metrics once per tick and broadcast to its subscribers"""
+    while True:
+        await asyncio.sleep(GPU_POLL_INTERVAL)
+        for gpu_id in list(manager.gpu_subscribers):
+            try:
+                message = _gpu_message(gpu_id)
+                if message:
+                    await manager.broadcast_to_gpu_subscribers(gpu_id, message)
+            except Exception as e:
+                logger.error(f"GPU metrics poller error for {gpu_id}: {e}")
+
+async def subnet_poller():
+    """Fetch each subscribed subnet's metrics once per tick and broadcast to its subscribers"""
+    while True:
+        await asyncio.sleep(SUBNET_POLL_INTERVAL)
+        for subnet_id in list(manager.subnet_subscribers):
+            try:
+                message = _subnet_message(subnet_id)
+                if message:
+                    await manager.broadcast_to_subnet_subscribers(subnet_id, message)
+            except Exception as e:
+                logger.error(f"Subnet metrics poller error for {subnet_id}: {e}")
+
+async def multi_poller():
+    """Send each /ws/multi client one frame per tick covering all of its topics"""
+    while True:
+        await asyncio.sleep(GPU_POLL_INTERVAL)
+        try:
+            # Clients with identical subscriptions share one encoded frame
+            groups: Dict[Tuple, List[WebSocket]] = {}
+            for websocket, subscription in list(manager.multi_subscribers.items()):
+                groups.setdefault(subscription, []).append(websocket)
+            if not groups:
+                continue
+            gpus, subnets, system = _fetch_multi_topics(groups)
+            await asyncio.gather(*(
+                manager.broadcast_to_multi_subscribers(websockets, _multi_message(subscription, gpus, subnets, system))
+                for subscription, websockets in groups.items()
+            ))
+        except Exception as e:
+            logger.error(f"Multiplexed metrics poller error: {e}")
+
+_poller_tasks: List[asyncio.Task] = []
+
+def start_pollers():
+    """Start the shared broadcast pollers (called from the application lifespan)"""
+    if not _poller_tasks:
+        _poller_tasks.extend(
+            asyncio.create_task(poller()) for poller in (system_poller, gpu_poller, subnet_poller, multi_poller)
+        )
+
+async def stop_pollers():
+    for task in _poller_tasks:
+        task.cancel()
+    await asyncio.gather(*_poller_tasks, return_exceptions=True)
+    _poller_tasks.clear()
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Updates arrive from the pollers; just drain client frames until it disconnects"""
+    while True:
+        await websocket.receive_text()
 
 # ===== WebSocket Endpoints =====
 
@@ -241,125 +427,100 @@ else:
 async def websocket_system_metrics(websocket: WebSocket):
     """WebSocket endpoint for real-time system metrics from Avalanche blockchain"""
     await manager.connect(websocket)
-    manager.subscribe_to_system(websocket)
+    if not manager.subscribe_to_system(websocket):
+        await manager.reject(websocket)
+        return
     
     try:
-        # Send initial data
-        system_metrics = monitoring_service.get_system_metrics()
-        await manager.send_personal_message(
-            json.dumps({
-                "type": "system_metrics",
-                "data": system_metrics,
-                "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                "timestamp": datetime.now().isoformat()
-            }),
-            websocket
-        )
-        
-        # Keep connection alive and send periodic updates
-        while True:
-            await asyncio.sleep(10)  # Update every 10 seconds
-            system_metrics = monitoring_service.get_system_metrics()
-            await manager.send_personal_message(
-                json.dumps({
-                    "type": "system_metrics",
-                    "data": system_metrics,
-                    "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                    "timestamp": datetime.now().isoformat()
-                }),
-                websocket
-            )
+        # Send initial data; periodic updates come from system_poller
+        await manager.send_personal_message(_system_message(), websocket)
+        await _wait_for_disconnect(websocket)
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket system metrics error: {e}")
+    finally:
         manager.disconnect(websocket)
 
 @router.websocket("/ws/gpu/{gpu_id}")
 async def websocket_gpu_metrics(websocket: WebSocket, gpu_id: str):
     """WebSocket endpoint for real-time GPU metrics from Avalanche blockchain"""
     await manager.connect(websocket)
-    manager.subscribe_to_gpu(websocket, gpu_id)
+    if not manager.subscribe_to_gpu(websocket, gpu_id):
+        await manager.reject(websocket)
+        return
     
     try:
-        # Send initial data
-        gpu_metrics = monitoring_service.get_gpu_metrics(gpu_id)
-        if gpu_metrics:
-            await manager.send_personal_message(
-                json.dumps({
-                    "type": "gpu_metrics",
-                    "gpu_id": gpu_id,
-                    "data": gpu_metrics,
-                    "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                    "timestamp": datetime.now().isoformat()
-                }),
-                websocket
-            )
-        
-        # Keep connection alive and send periodic updates
-        while True:
-            await asyncio.sleep(5)  # Update every 5 seconds
-            gpu_metrics = monitoring_service.get_gpu_metrics(gpu_id)
-            if gpu_metrics:
-                await manager.send_personal_message(
-                    json.dumps({
-                        "type": "gpu_metrics",
-                        "gpu_id": gpu_id,
-                        "data": gpu_metrics,
-                        "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                        "timestamp": datetime.now().isoformat()
-                    }),
-                    websocket
-                )
+        # Send initial data; periodic updates come from gpu_poller
+        message = _gpu_message(gpu_id)
+        if message:
+            await manager.send_personal_message(message, websocket)
+        await _wait_for_disconnect(websocket)
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket GPU metrics error: {e}")
+    finally:
         manager.disconnect(websocket)
 
 @router.websocket("/ws/subnet/{subnet_id}")
 async def websocket_subnet_metrics(websocket: WebSocket, subnet_id: str):
     """WebSocket endpoint for real-time subnet metrics from Avalanche blockchain"""
     await manager.connect(websocket)
-    manager.subscribe_to_subnet(websocket, subnet_id)
+    if not manager.subscribe_to_subnet(websocket, subnet_id):
+        await manager.reject(websocket)
+        return
+    
+    try:
+        # Send initial data; periodic updates come from subnet_poller
+        message = _subnet_message(subnet_id)
+        if message:
+            await manager.send_personal_message(message, websocket)
+        await _wait_for_disconnect(websocket)
+            
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket subnet metrics error: {e}")
+    finally:
+        manager.disconnect(websocket)
+
+@router.websocket("/ws/multi")
+async def websocket_multi_metrics(websocket: WebSocket):
+    """Multiplexed WebSocket endpoint: one frame per tick for all requested topics
+
+    The first client message selects the topics:
+    {"subscribe": {"gpus": [...], "subnets": [...], "system": true}}
+    """
+    await manager.connect(websocket)
     
     try:
-        # Send initial data
-        subnet_metrics = monitoring_service.get_subnet_metrics(subnet_id)
-        if subnet_metrics:
-            await manager.send_personal_message(
-                json.dumps({
-                    "type": "subnet_metrics",
-                    "subnet_id": subnet_id,
-                    "data": subnet_metrics.get(subnet_id, {}) if isinstance(subnet_metrics, dict) else subnet_metrics,
-                    "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                    "timestamp": datetime.now().isoformat()
-                }),
-                websocket
-            )
+        request = orjson.loads(await websocket.receive_text()).get("subscribe") or {}
+        subscription = (
+            tuple(dict.fromkeys(str(gpu_id) for gpu_id in request.get("gpus") or ())),
+            tuple(dict.fromkeys(str(subnet_id) for subnet_id in request.get("subnets") or ())),
+            bool(request.get("system", False))
+        )
+        if not manager.subscribe_to_multi(websocket, *subscription):
+            await manager.reject(websocket)
+            return
         
-        # Keep connection alive and send periodic updates
-        while True:
-            await asyncio.sleep(10)  # Update every 10 seconds
-            subnet_metrics = monitoring_service.get_subnet_metrics(subnet_id)
-            if subnet_metrics:
-                await manager.send_personal_message(
-                    json.dumps({
-                        "type": "subnet_metrics",
-                        "subnet_id": subnet_id,
-                        "data": subnet_metrics.get(subnet_id, {}) if isinstance(subnet_metrics, dict) else subnet_metrics,
-                        "source": "avalanche_blockchain" if REAL_MONITORING_AVAILABLE else "mock",
-                        "timestamp": datetime.now().isoformat()
-                    }),
-                    websocket
-                )
+        # Send initial data; periodic updates come from multi_poller
+        gpus, subnets, system = _fetch_multi_topics([subscription])
+        await manager.send_personal_message(_multi_message(subscription, gpus, subnets, system), websocket)
+        await _wait_for_disconnect(websocket)
             
     except WebSocketDisconnect:
+        pass
+    except (orjson.JSONDecodeError, AttributeError, TypeError) as e:
+        logger.warning(f"Invalid multiplexed subscription: {e}")
         manager.disconnect(websocket)
+        await websocket.close(code=1003)
     except Exception as e:
-        logger.error(f"WebSocket subnet metrics error: {e}")
+        logger.error(f"WebSocket multiplexed metrics error: {e}")
+    finally:
         manager.disconnect(websocket)
 
 # ===== REST API Endpoints =====
@@ -428,22 +589,13 @@ async def get_system_health():
     """Get overall system health status from Avalanche blockchain"""
     try:
         system_metrics = monitoring_service.get_system_metrics()
-        gpu_metrics = monitoring_service.get_gpu_metrics()
+        gpu_health = monitoring_service.get_gpu_health_counts()
         
         # Calculate health indicators
         total_gpus = system_metrics.get("total_gpus", 0)
-        healthy_gpus = 0
-        warning_gpus = 0
-        critical_gpus = 0
-        
-        for gpu_id, gpu_data in gpu_metrics.items():
-            temp = gpu_data.get("temperature", 0)
-            if temp > 90:
-                critical_gpus += 1
-            elif temp > 85:
-                warning_gpus += 1
-            else:
-                healthy_gpus += 1
+        healthy_gpus = gpu_health["healthy"]
+        warning_gpus = gpu_health["warning"]
+        critical_gpus = gpu_health["critical"]
         
         # Determine overall health
         if critical_gpus > 0:
@@ -464,7 +616,7 @@ async def get_system_health():
             },
             "system_utilization": system_metrics.get("avg_system_utilization", 0),
             "active_subnets": system_metrics.get("active_subnets", 0),
-            "last_updated": datetime.now().isoformat()
+            "last_updated": datetime.now()
         }
         
         return {"success": True, "data": health_data}
@@ -479,13 +631,7 @@ async def get_system_health():
 async def broadcast_system_update():
     """Manually trigger system metrics broadcast"""
     try:
-        system_metrics = mock_monitoring_service.get_system_metrics()
-        message = json.dumps({
-            "type": "system_metrics",
-            "data": system_metrics,
-            "timestamp": datetime.now().isoformat()
-        })
-        await manager.broadcast_to_system_subscribers(message)
+        await manager.broadcast_to_system_subscribers(_system_message())
         return {"success": True, "message": "System update broadcasted"}
     except Exception as e:
         logger.error(f"Error broadcasting system update: {e}")
@@ -500,7 +646,7 @@ async def get_connection_stats():
             "system_subscribers": len(manager.system_subscribers),
             "gpu_subscribers": {gpu_id: len(subs) for gpu_id, subs in manager.gpu_subscribers.items()},
             "subnet_subscribers": {subnet_id: len(subs) for subnet_id, subs in manager.subnet_subscribers.items()},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
         return {"success": True, "data": stats}
     except Exception as e:
@@ -6,17 +6,254 @@ Connects to Avalanche C-Chain to fetch real GPU and subnet data
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import random
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from collections import deque
+from pathlib import Path
+import orjson
+import requests
+import websockets
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector
+from hexbytes import HexBytes
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 from web3.contract import Contract
 from web3.exceptions import ContractLogicError, BlockNotFound
+from web3._utils.abi import get_abi_input_types, get_abi_output_types, map_abi_data
+from web3._utils.events import get_event_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 from dataclasses import dataclass
 import time
 
 logger = logging.getLogger(__name__)
 
+# Multicall3 is deployed at the same address on Avalanche C-Chain (mainnet and Fuji)
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {"name": "requireSuccess", "type": "bool"},
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "tryAggregate",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"name": "requireSuccess", "type": "bool"},
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "tryBlockAndAggregate",
+        "outputs": [
+            {"name": "blockNumber", "type": "uint256"},
+            {"name": "blockHash", "type": "bytes32"},
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# Fallback ABIs used when no compiled artifact is found
+_MINIMAL_ABIS: Dict[str, Tuple[Dict[str, Any], ...]] = {
+    "EryzaGPUSubnetManager": (
+        {
+            "inputs": [{"name": "gpu_id", "type": "string"}],
+            "name": "gpus",
+            "outputs": [
+                {"name": "gpu_id", "type": "string"},
+                {"name": "owner", "type": "address"},
+                {"name": "current_renter", "type": "address"},
+                {"name": "compute_power", "type": "uint256"},
+                {"name": "memory_size", "type": "uint256"},
+                {"name": "gpu_model", "type": "string"},
+                {"name": "active", "type": "bool"},
+                {"name": "rental_start", "type": "uint256"},
+                {"name": "rental_end", "type": "uint256"},
+                {"name": "current_subnet", "type": "bytes32"}
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [],
+            "name": "getAllGPUIds",
+            "outputs": [{"name": "", "type": "string[]"}],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [],
+            "name": "getAllSubnetIds", 
+            "outputs": [{"name": "", "type": "bytes32[]"}],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [{"name": "subnet_id", "type": "bytes32"}],
+            "name": "subnets",
+            "outputs": [
+                {"name": "subnet_id", "type": "bytes32"},
+                {"name": "coordinator", "type": "address"},
+                {"name": "gpu_ids", "type": "string[]"},
+                {"name": "total_compute", "type": "uint256"},
+                {"name": "total_memory", "type": "uint256"},
+                {"name": "created_at", "type": "uint256"},
+                {"name": "active", "type": "bool"},
+                {"name": "purpose", "type": "string"}
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [],
+            "name": "getSystemStats",
+            "outputs": [
+                {"name": "total_gpus", "type": "uint256"},
+                {"name": "rented_gpus", "type": "uint256"},
+                {"name": "active_subnets", "type": "uint256"},
+                {"name": "total_compute_power", "type": "uint256"}
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ),
+    "EryzaToken": (
+        {
+            "inputs": [],
+            "name": "totalSupply",
+            "outputs": [{"name": "", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function"
+        },
+    )
+}
+
+ABI_SEARCH_PATHS = (
+    "blockchain/artifacts/contracts/{name}.sol/{name}.json",
+    "contract/{name}.json",
+    "artifacts/{name}.json"
+)
+
+KNOWN_CONTRACTS = ("EryzaToken", "EryzaGPUSubnetManager")
+
+def _read_abi(contract_name: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """Read and parse a contract's artifact ABI from the first path that exists"""
+    for path_template in ABI_SEARCH_PATHS:
+        abi_path = Path(path_template.format(name=contract_name))
+        try:
+            if abi_path.exists():
+                return tuple(orjson.loads(abi_path.read_bytes()).get('abi', []))
+        except Exception as e:
+            logger.debug(f"Could not load ABI from {abi_path}: {e}")
+    return None
+
+# Artifact ABIs are parsed once at import, so no disk I/O happens on the event loop
+_ABI_CACHE: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+for _name in KNOWN_CONTRACTS:
+    _abi = _read_abi(_name)
+    if _abi is not None:
+        _ABI_CACHE[_name] = _abi
+
+_ZERO_ADDR = "0x0000000000000000000000000000000000000000"
+
+class GPUState(NamedTuple):
+    """Decoded gpus(gpu_id) result, fields in ABI output order"""
+    gpu_id: str
+    owner: str
+    current_renter: str
+    compute_power: int
+    memory_size: int
+    gpu_model: str
+    active: bool
+    rental_start: int
+    rental_end: int
+    current_subnet: bytes
+    
+    @property
+    def is_rented(self) -> bool:
+        return self.current_renter != _ZERO_ADDR
+    
+    @property
+    def rental_active(self) -> bool:
+        return self.is_rented and time.time() < self.rental_end
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # One zero-address compare and one clock read per GPU
+        is_rented = self.current_renter != _ZERO_ADDR
+        return {
+            "gpu_id": self.gpu_id,
+            "owner": self.owner,
+            "current_renter": self.current_renter,
+            "compute_power": self.compute_power,
+            "memory_size": self.memory_size,
+            "gpu_model": self.gpu_model,
+            "active": self.active,
+            "rental_start": self.rental_start,
+            "rental_end": self.rental_end,
+            "current_subnet": self.current_subnet.hex() if any(self.current_subnet) else None,
+            "is_rented": is_rented,
+            "rental_active": is_rented and time.time() < self.rental_end
+        }
+
+class SubnetState(NamedTuple):
+    """Decoded subnets(subnet_id) result, fields in ABI output order"""
+    subnet_id: bytes
+    coordinator: str
+    gpu_ids: List[str]
+    total_compute: int
+    total_memory: int
+    created_at: int
+    active: bool
+    purpose: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "subnet_id": self.subnet_id.hex(),
+            "coordinator": self.coordinator,
+            "gpu_ids": self.gpu_ids,
+            "total_compute": self.total_compute,
+            "total_memory": self.total_memory,
+            "created_at": self.created_at,
+            "active": self.active,
+            "purpose": self.purpose,
+            "gpu_count": len(self.gpu_ids)
+        }
+
 @dataclass
 class BlockchainConfig:
     """Avalanche blockchain configuration"""
@@ -25,6 +262,9 @@ class BlockchainConfig:
     testnet_rpc: str = "https://api.avax-test.network/ext/bc/C/rpc"
     local_rpc: str = "http://localhost:9650/ext/bc/C/rpc"
     
+    # WebSocket endpoint for pushed log subscriptions (falls back to filter polling if unset)
+    ws_rpc: Optional[str] = None
+    
     # Chain IDs
     mainnet_chain_id: int = 43114
     testnet_chain_id: int = 43113
@@ -33,11 +273,42 @@ class BlockchainConfig:
     # Contract addresses (to be configured)
     eryza_token_address: Optional[str] = None
     gpu_subnet_manager_address: Optional[str] = None
+    multicall3_address: str = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    
+    # Calls packed into one Multicall3 request (bounded by provider gas/response limits)
+    multicall_batch_size: int = 500
+    
+    # Ids fetched and decoded per step of get_all_gpu_data / get_all_subnet_data, bounding
+    # how many raw responses and decoded tuples are in flight at once
+    max_ids_per_batch: int = 500
+    
+    # eth_calls per JSON-RPC batch POST (many providers reject larger batches)
+    rpc_batch_size: int = 100
+    
+    # Widest eth_getLogs block range per poll (public RPCs cap the range)
+    max_log_block_range: int = 2048
+    
+    # How long a successful eth_blockNumber connectivity check is reused
+    connection_check_ttl: float = 1.0
+    
+    # eth_call results are shared within a block, for at most this long (about one C-Chain block)
+    call_cache_ttl: float = 2.0
+    
+    # How long GPU/subnet id lists and per-GPU state are reused (events invalidate sooner)
+    gpu_cache_ttl: float = 30.0
+    
+    # Concurrent blocking RPC calls
+    rpc_max_workers: int = 32
     
     # Connection settings
     request_timeout: int = 30
     max_retries: int = 3
-    retry_delay: int = 2
+    retry_delay: int = 2  # Base delay, doubled on each retry (plus jitter)
+    max_retry_delay: float = 30.0
+    
+    # Circuit breaker: after this many consecutive failed calls, fail fast for the cooldown
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_cooldown: float = 30.0
 
 class AvalancheBlockchainManager:
     """Manages connection to Avalanche blockchain and smart contract interactions"""
@@ -45,14 +316,48 @@ class AvalancheBlockchainManager:
     def __init__(self, config: BlockchainConfig = None):
         self.config = config or BlockchainConfig()
         self.w3: Optional[Web3] = None
+        self.rpc_url: Optional[str] = None
+        # Pooled keep-alive session shared by the Web3 provider and raw JSON-RPC batches,
+        # so RPC calls reuse open TCP/TLS connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=0)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Bounded pool for blocking RPC calls, sized to the connection pool
+        self._executor = self._new_executor()
+        # Set by disconnect() so in-flight retries stop instead of calling a torn-down client
+        self._shutdown = asyncio.Event()
         self.eryza_token_contract: Optional[Contract] = None
         self.gpu_subnet_manager_contract: Optional[Contract] = None
+        self.multicall3_contract: Optional[Contract] = None
         self.is_connected_flag = False
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
         self.current_network = "testnet"  # Default to testnet
         self.latest_block = 0
+        self._last_block_check = 0.0
+        
+        # Last block whose logs were polled with eth_getLogs (None until monitoring is set up)
+        self._last_scanned_block: Optional[int] = None
+        # Pushed events from the eth_subscribe("logs") stream, drained by get_recent_events
+        self._event_queue: deque = deque(maxlen=1000)
+        # topic0 -> (event name, event ABI), computed once when the contract is loaded
+        self._event_topics: Dict[bytes, Tuple[str, Dict[str, Any]]] = {}
+        self._event_topic_hexes: List[str] = []
+        # (contract address, function name) -> ContractFunction, selector, input and output types
+        self._function_specs: Dict[Tuple[str, str], Tuple[Any, bytes, List[str], List[str]]] = {}
+        self._subscription_task: Optional[asyncio.Task] = None
+        
+        # TTL caches for the id lists and per-GPU state, invalidated by contract events
+        self._gpu_ids_cache: Optional[Tuple[float, List[str]]] = None
+        self._subnet_ids_cache: Optional[Tuple[float, List[bytes]]] = None
+        self._gpu_cache: Dict[str, Tuple[float, GPUState]] = {}
+        # eth_call responses for the current block, keyed on the serialized params
+        self._call_cache: Dict[str, Dict[str, Any]] = {}
+        self._call_cache_key: Tuple[int, float] = (0, 0.0)
         
-        # Event filters for real-time monitoring
-        self.event_filters = {}
+        # Indexed string event args arrive as keccak hashes; map them back to GPU ids
+        self._gpu_id_hashes: Dict[bytes, str] = {}
         self.monitored_events = [
             'GPURegistered',
             'GPURented', 
@@ -63,8 +368,16 @@ class AvalancheBlockchainManager:
             'GPUMetricsUpdated'
         ]
     
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.config.rpc_max_workers, thread_name_prefix="avalanche-rpc")
+    
     async def initialize(self, network: str = "testnet", custom_rpc: str = None):
         """Initialize connection to Avalanche blockchain"""
+        if self._shutdown.is_set():
+            # Reconnecting after disconnect(): the old pool was shut down
+            self._executor = self._new_executor()
+            self._shutdown.clear()
+        
         try:
             # Determine RPC endpoint
             if custom_rpc:
@@ -77,13 +390,18 @@ class AvalancheBlockchainManager:
                 rpc_url = self.config.testnet_rpc
             
             logger.info(f"Connecting to Avalanche {network} at {rpc_url}")
+            self.rpc_url = rpc_url
             
             # Create Web3 connection
             self.w3 = Web3(Web3.HTTPProvider(
                 rpc_url,
-                request_kwargs={'timeout': self.config.request_timeout}
+                request_kwargs={'timeout': self.config.request_timeout},
+                session=self._session
             ))
             
+            # Identical eth_calls within a block share one RPC
+            self.w3.middleware_onion.add(self._call_cache_middleware, name="block_call_cache")
+            
             # Test connection
             if not self.w3.isConnected():
                 raise ConnectionError("Failed to connect to Avalanche RPC")
@@ -120,8 +438,8 @@ class AvalancheBlockchainManager:
         """Load smart contract instances"""
         try:
             # Load contract ABIs (you'll need to place these files in your project)
-            eryza_token_abi = await self._load_contract_abi("EryzaToken")
-            gpu_subnet_manager_abi = await self._load_contract_abi("EryzaGPUSubnetManager")
+            eryza_token_abi = self._load_contract_abi("EryzaToken")
+            gpu_subnet_manager_abi = self._load_contract_abi("EryzaGPUSubnetManager")
             
             # Get contract addresses from environment or config
             token_address = (
@@ -151,28 +469,37 @@ class AvalancheBlockchainManager:
                 )
                 logger.info(f"✅ Loaded GPUSubnetManager contract at {subnet_manager_address}")
                 
+                self._event_topics = {
+                    bytes(event_abi_to_log_topic(abi)): (abi["name"], abi)
+                    for abi in gpu_subnet_manager_abi
+                    if abi.get("type") == "event" and abi.get("name") in self.monitored_events
+                }
+                self._event_topic_hexes = ["0x" + topic.hex() for topic in self._event_topics]
+                
+                # Warm the per-id read paths used by get_all_gpu_data / get_all_subnet_data
+                for fn_name in ("gpus", "subnets", "getSystemStats"):
+                    try:
+                        self._function_spec(self.gpu_subnet_manager_contract, fn_name)
+                    except ValueError:
+                        logger.debug(f"Function {fn_name} not found in contract ABI")
+            
+            multicall3_address = os.getenv("MULTICALL3_ADDRESS") or self.config.multicall3_address
+            if multicall3_address:
+                self.multicall3_contract = self.w3.eth.contract(
+                    address=Web3.toChecksumAddress(multicall3_address),
+                    abi=MULTICALL3_ABI
+                )
+                
         except Exception as e:
             logger.error(f"Failed to load contracts: {e}")
             # Continue without contracts for testing
     
-    async def _load_contract_abi(self, contract_name: str) -> Optional[List]:
+    def _load_contract_abi(self, contract_name: str) -> Optional[List]:
         """Load contract ABI from artifacts"""
         try:
-            # Try to load from blockchain artifacts directory
-            abi_paths = [
-                f"blockchain/artifacts/contracts/{contract_name}.sol/{contract_name}.json",
-                f"contract/{contract_name}.json",
-                f"artifacts/{contract_name}.json"
-            ]
-            
-            for abi_path in abi_paths:
-                try:
-                    if os.path.exists(abi_path):
-                        with open(abi_path, 'r') as f:
-                            contract_data = json.load(f)
-                            return contract_data.get('abi', [])
-                except Exception as e:
-                    logger.debug(f"Could not load ABI from {abi_path}: {e}")
+            abi = _ABI_CACHE.get(contract_name)
+            if abi is not None:
+                return list(abi)
             
             # Return minimal ABI for testing
             logger.warning(f"Using minimal ABI for {contract_name}")
@@ -184,105 +511,28 @@ class AvalancheBlockchainManager:
     
     def _get_minimal_abi(self, contract_name: str) -> List:
         """Get minimal ABI for testing purposes"""
-        if contract_name == "EryzaGPUSubnetManager":
-            return [
-                {
-                    "inputs": [{"name": "gpu_id", "type": "string"}],
-                    "name": "gpus",
-                    "outputs": [
-                        {"name": "gpu_id", "type": "string"},
-                        {"name": "owner", "type": "address"},
-                        {"name": "current_renter", "type": "address"},
-                        {"name": "compute_power", "type": "uint256"},
-                        {"name": "memory_size", "type": "uint256"},
-                        {"name": "gpu_model", "type": "string"},
-                        {"name": "active", "type": "bool"},
-                        {"name": "rental_start", "type": "uint256"},
-                        {"name": "rental_end", "type": "uint256"},
-                        {"name": "current_subnet", "type": "bytes32"}
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [],
-                    "name": "getAllGPUIds",
-                    "outputs": [{"name": "", "type": "string[]"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [],
-                    "name": "getAllSubnetIds", 
-                    "outputs": [{"name": "", "type": "bytes32[]"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [{"name": "subnet_id", "type": "bytes32"}],
-                    "name": "subnets",
-                    "outputs": [
-                        {"name": "subnet_id", "type": "bytes32"},
-                        {"name": "coordinator", "type": "address"},
-                        {"name": "gpu_ids", "type": "string[]"},
-                        {"name": "total_compute", "type": "uint256"},
-                        {"name": "total_memory", "type": "uint256"},
-                        {"name": "created_at", "type": "uint256"},
-                        {"name": "active", "type": "bool"},
-                        {"name": "purpose", "type": "string"}
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                },
-                {
-                    "inputs": [],
-                    "name": "getSystemStats",
-                    "outputs": [
-                        {"name": "total_gpus", "type": "uint256"},
-                        {"name": "rented_gpus", "type": "uint256"},
-                        {"name": "active_subnets", "type": "uint256"},
-                        {"name": "total_compute_power", "type": "uint256"}
-                    ],
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-            ]
-        elif contract_name == "EryzaToken":
-            return [
-                {
-                    "inputs": [],
-                    "name": "totalSupply",
-                    "outputs": [{"name": "", "type": "uint256"}],
-                    "stateMutability": "view",
-                    "type": "function"
-                }
-            ]
-        return []
+        return list(_MINIMAL_ABIS.get(contract_name, ()))
     
     async def _setup_event_monitoring(self):
         """Setup event filters for real-time monitoring"""
         if not self.gpu_subnet_manager_contract:
             logger.warning("GPU Subnet Manager contract not loaded, skipping event monitoring")
             return
+        if not self._event_topics:
+            logger.warning("No monitored events in the contract ABI, skipping event monitoring")
+            return
+        
+        ws_url = os.getenv("AVALANCHE_WS_URL") or self.config.ws_rpc
+        if ws_url:
+            # The node pushes matching logs; nothing is polled per event type
+            self._subscription_task = asyncio.create_task(self._subscribe_logs(ws_url))
+            return
         
         try:
-            # Create event filters for monitored events
-            latest_block = self.w3.eth.block_number
-            
-            for event_name in self.monitored_events:
-                try:
-                    event_filter = getattr(
-                        self.gpu_subnet_manager_contract.events, 
-                        event_name
-                    ).createFilter(fromBlock=latest_block)
-                    
-                    self.event_filters[event_name] = event_filter
-                    logger.debug(f"Created event filter for {event_name}")
-                    
-                except AttributeError:
-                    logger.debug(f"Event {event_name} not found in contract ABI")
-                except Exception as e:
-                    logger.error(f"Failed to create filter for {event_name}: {e}")
+            # Poll with eth_getLogs from a block cursor rather than server-side filters,
+            # which many providers expire or drop silently
+            self._last_scanned_block = self.w3.eth.block_number
+            logger.debug(f"Polling {len(self._event_topics)} events from block {self._last_scanned_block}")
                     
         except Exception as e:
             logger.error(f"Failed to setup event monitoring: {e}")
@@ -292,10 +542,17 @@ class AvalancheBlockchainManager:
         if not self.w3:
             return False
         
+        now = time.monotonic()
+        if self.is_connected_flag and now - self._last_block_check < self.config.connection_check_ttl:
+            return True
+        
         try:
             # Test connection with a simple call
             current_block = self.w3.eth.block_number
             self.latest_block = current_block
+            # Restore the flag with the check time, or the TTL fast path stays off after one error
+            self.is_connected_flag = True
+            self._last_block_check = now
             return True
         except Exception as e:
             logger.error(f"Connection check failed: {e}")
@@ -310,45 +567,46 @@ class AvalancheBlockchainManager:
         
         try:
             # Get all GPU IDs
-            gpu_ids = await self._call_contract_function(
-                self.gpu_subnet_manager_contract.functions.getAllGPUIds()
-            )
+            now = time.monotonic()
+            if self._gpu_ids_cache and now - self._gpu_ids_cache[0] < self.config.gpu_cache_ttl:
+                gpu_ids = self._gpu_ids_cache[1]
+            else:
+                gpu_ids = await self._call_contract_function(
+                    self.gpu_subnet_manager_contract.functions.getAllGPUIds()
+                )
+                self._gpu_ids_cache = (now, gpu_ids)
+                self._gpu_id_hashes = {bytes(Web3.keccak(text=gpu_id)): gpu_id for gpu_id in gpu_ids}
             
             if not gpu_ids:
                 logger.info("No GPUs found on blockchain")
                 return {}
             
-            gpu_data = {}
+            gpu_states: Dict[str, GPUState] = {}
             
-            # Fetch data for each GPU
+            # Reuse cached GPUs; only refetch the ones that expired or were invalidated
+            stale_ids = []
             for gpu_id in gpu_ids:
-                try:
-                    gpu_info = await self._call_contract_function(
-                        self.gpu_subnet_manager_contract.functions.gpus(gpu_id)
-                    )
-                    
-                    if gpu_info:
-                        gpu_data[gpu_id] = {
-                            "gpu_id": gpu_info[0],
-                            "owner": gpu_info[1],
-                            "current_renter": gpu_info[2],
-                            "compute_power": gpu_info[3],
-                            "memory_size": gpu_info[4], 
-                            "gpu_model": gpu_info[5],
-                            "active": gpu_info[6],
-                            "rental_start": gpu_info[7],
-                            "rental_end": gpu_info[8],
-                            "current_subnet": gpu_info[9].hex() if gpu_info[9] != b'\x00' * 32 else None,
-                            "is_rented": gpu_info[2] != "0x0000000000000000000000000000000000000000",
-                            "rental_active": (
-                                gpu_info[2] != "0x0000000000000000000000000000000000000000" and
-                                time.time() < gpu_info[8]
-                            )
-                        }
-                        
-                except Exception as e:
-                    logger.error(f"Failed to fetch data for GPU {gpu_id}: {e}")
-                    
+                cached = self._gpu_cache.get(gpu_id)
+                if cached and now - cached[0] < self.config.gpu_cache_ttl:
+                    gpu_states[gpu_id] = cached[1]
+                else:
+                    stale_ids.append(gpu_id)
+            
+            # Fetch the rest in batched Multicall3 requests, one bounded chunk at a time
+            for chunk in self._chunks(stale_ids):
+                gpu_infos = await self._multicall(self.gpu_subnet_manager_contract, "gpus", chunk)
+                for gpu_id, gpu_info in zip(chunk, gpu_infos):
+                    try:
+                        if gpu_info:
+                            state = GPUState(*gpu_info)
+                            gpu_states[gpu_id] = state
+                            self._gpu_cache[gpu_id] = (now, state)
+                            
+                    except Exception as e:
+                        logger.error(f"Failed to fetch data for GPU {gpu_id}: {e}")
+            
+            # States stay tuples internally; dicts are built only for callers
+            gpu_data = {gpu_id: state.to_dict() for gpu_id, state in gpu_states.items()}
             logger.info(f"Fetched data for {len(gpu_data)} GPUs from blockchain")
             return gpu_data
             
@@ -364,9 +622,14 @@ class AvalancheBlockchainManager:
         
         try:
             # Get all subnet IDs
-            subnet_ids = await self._call_contract_function(
-                self.gpu_subnet_manager_contract.functions.getAllSubnetIds()
-            )
+            now = time.monotonic()
+            if self._subnet_ids_cache and now - self._subnet_ids_cache[0] < self.config.gpu_cache_ttl:
+                subnet_ids = self._subnet_ids_cache[1]
+            else:
+                subnet_ids = await self._call_contract_function(
+                    self.gpu_subnet_manager_contract.functions.getAllSubnetIds()
+                )
+                self._subnet_ids_cache = (now, subnet_ids)
             
             if not subnet_ids:
                 logger.info("No subnets found on blockchain")
@@ -374,28 +637,18 @@ class AvalancheBlockchainManager:
             
             subnet_data = {}
             
-            # Fetch data for each subnet
-            for subnet_id in subnet_ids:
-                try:
-                    subnet_info = await self._call_contract_function(
-                        self.gpu_subnet_manager_contract.functions.subnets(subnet_id)
-                    )
-                    
-                    if subnet_info and subnet_info[6]:  # Check if active
-                        subnet_data[subnet_id.hex()] = {
-                            "subnet_id": subnet_id.hex(),
-                            "coordinator": subnet_info[1],
-                            "gpu_ids": subnet_info[2],
-                            "total_compute": subnet_info[3],
-                            "total_memory": subnet_info[4],
-                            "created_at": subnet_info[5],
-                            "active": subnet_info[6],
-                            "purpose": subnet_info[7],
-                            "gpu_count": len(subnet_info[2])
-                        }
-                        
-                except Exception as e:
-                    logger.error(f"Failed to fetch data for subnet {subnet_id.hex()}: {e}")
+            # Fetch every subnet in batched Multicall3 requests, one bounded chunk at a time
+            for chunk in self._chunks(subnet_ids):
+                subnet_infos = await self._multicall(self.gpu_subnet_manager_contract, "subnets", chunk)
+                for subnet_id, subnet_info in zip(chunk, subnet_infos):
+                    try:
+                        if subnet_info:
+                            state = SubnetState(*subnet_info)
+                            if state.active:
+                                subnet_data[subnet_id.hex()] = state.to_dict()
+                            
+                    except Exception as e:
+                        logger.error(f"Failed to fetch data for subnet {subnet_id.hex()}: {e}")
                     
             logger.info(f"Fetched data for {len(subnet_data)} subnets from blockchain")
             return subnet_data
@@ -404,6 +657,12 @@ class AvalancheBlockchainManager:
             logger.error(f"Failed to get subnet data: {e}")
             return {}
     
+    def _chunks(self, ids: List[Any]):
+        """Split ids into max_ids_per_batch sized slices"""
+        size = self.config.max_ids_per_batch
+        for start in range(0, len(ids), size):
+            yield ids[start:start + size]
+    
     async def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics from blockchain"""
         if not self.gpu_subnet_manager_contract:
@@ -411,9 +670,7 @@ class AvalancheBlockchainManager:
             return {}
         
         try:
-            stats = await self._call_contract_function(
-                self.gpu_subnet_manager_contract.functions.getSystemStats()
-            )
+            stats = await self._call_with_block(self.gpu_subnet_manager_contract, "getSystemStats")
             
             if stats:
                 return {
@@ -430,64 +687,401 @@ class AvalancheBlockchainManager:
         except Exception as e:
             logger.error(f"Failed to get system stats: {e}")
         
+        # No extra eth_blockNumber here: report the state the last RPC left behind
         return {
-            "blockchain_connected": self.is_connected(),
+            "blockchain_connected": self.is_connected_flag,
             "latest_block": self.latest_block,
             "network": self.current_network
         }
     
+    async def _call_with_block(self, contract: Contract, fn_name: str) -> Optional[tuple]:
+        """Call a no-argument view function, refreshing latest_block from the same request
+        
+        Goes through Multicall3 tryBlockAndAggregate so the block number rides along with
+        the read instead of costing a separate eth_blockNumber.
+        """
+        function, selector, _, output_types = self._function_spec(contract, fn_name)
+        if not self.multicall3_contract:
+            return await self._call_contract_function(function())
+        
+        block_number, _, ((success, data),) = await self._call_contract_function(
+            self.multicall3_contract.functions.tryBlockAndAggregate(True, [(contract.address, selector)])
+        )
+        self.latest_block = block_number
+        self._last_block_check = time.monotonic()
+        return self._decode_output(output_types, data) if success else None
+    
+    async def _subscribe_logs(self, ws_url: str):
+        """Receive monitored contract events via eth_subscribe, reconnecting on failure"""
+        subscribe_request = json.dumps({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_subscribe",
+            "params": ["logs", {
+                "address": self.gpu_subnet_manager_contract.address,
+                "topics": [self._event_topic_hexes]
+            }]
+        })
+        attempt = 0
+        
+        while True:
+            try:
+                async with websockets.connect(ws_url) as ws:
+                    await ws.send(subscribe_request)
+                    logger.info(f"Subscribed to {len(self._event_topics)} contract events at {ws_url}")
+                    attempt = 0
+                    async for message in ws:
+                        log = json.loads(message).get("params", {}).get("result")
+                        if log and not log.get("removed"):  # Skip logs dropped by a reorg
+                            event = self._decode_log(self._format_raw_log(log), datetime.now().isoformat())
+                            if event:
+                                self._event_queue.append(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event subscription error: {e}")
+            
+            delay = min(self.config.max_retry_delay, self.config.retry_delay * (2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(delay + random.uniform(0, 0.5))
+    
+    @staticmethod
+    def _format_raw_log(log: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw JSON-RPC log to the shape web3's filters return"""
+        return {
+            **log,
+            "topics": [HexBytes(topic) for topic in log.get("topics", [])],
+            "blockNumber": int(log["blockNumber"], 16),
+            "transactionHash": HexBytes(log["transactionHash"]),
+            "blockHash": HexBytes(log["blockHash"]),
+            "logIndex": int(log["logIndex"], 16),
+            "transactionIndex": int(log["transactionIndex"], 16)
+        }
+    
+    def _decode_log(self, log: Dict[str, Any], timestamp: str) -> Optional[Dict[str, Any]]:
+        """Decode a log into the get_recent_events shape, dispatching on topic0"""
+        topics = log.get("topics")
+        match = self._event_topics.get(bytes(topics[0])) if topics else None
+        if not match:
+            return None
+        event_name, event_abi = match
+        try:
+            entry = get_event_data(self.w3.codec, event_abi, log)
+        except Exception as e:
+            logger.error(f"Failed to decode {event_name} log: {e}")
+            return None
+        return {
+            "event": event_name,
+            "block_number": entry.blockNumber,
+            "transaction_hash": entry.transactionHash.hex(),
+            "args": dict(entry.args),
+            "timestamp": timestamp
+        }
+    
     async def get_recent_events(self, event_types: List[str] = None) -> List[Dict[str, Any]]:
         """Get recent blockchain events"""
-        if not self.event_filters:
+        if self._subscription_task:
+            # Drain everything pushed since the last call
+            wanted = set(event_types or self.monitored_events)
+            events = []
+            while self._event_queue:
+                event = self._event_queue.popleft()
+                if event["event"] in wanted:
+                    events.append(event)
+            self._invalidate_for_events(events)
+            return events
+        
+        if self._last_scanned_block is None:
             return []
         
         events = []
-        event_types = event_types or self.monitored_events
+        wanted = set(event_types or self.monitored_events)
         
-        for event_name in event_types:
-            if event_name not in self.event_filters:
+        try:
+            loop = asyncio.get_running_loop()
+            current_block = await loop.run_in_executor(self._executor, lambda: self.w3.eth.block_number)
+            self.latest_block = current_block
+            self._last_block_check = time.monotonic()
+            
+            from_block = self._last_scanned_block + 1
+            if current_block >= from_block:
+                to_block = min(current_block, from_block + self.config.max_log_block_range - 1)
+                # One eth_getLogs covers every monitored event; entries are dispatched by topic0
+                logs = await loop.run_in_executor(self._executor, self.w3.eth.get_logs, {
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "address": self.gpu_subnet_manager_contract.address,
+                    "topics": [self._event_topic_hexes]
+                })
+                # Every event from one poll shares the poll's timestamp
+                now_iso = datetime.now().isoformat()
+                for entry in logs:
+                    event = self._decode_log(entry, now_iso)
+                    if event and event["event"] in wanted:
+                        events.append(event)
+                self._last_scanned_block = to_block
+                    
+        except Exception as e:
+            logger.error(f"Failed to get events: {e}")
+        
+        self._invalidate_for_events(events)
+        # eth_getLogs returns logs in (block, log index) order, so no re-sort is needed
+        return events
+    
+    def resolve_gpu_id(self, gpu_id: Any) -> Optional[str]:
+        """GPU id from an event arg; indexed string args arrive as their keccak hash"""
+        if isinstance(gpu_id, (bytes, bytearray)):
+            return self._gpu_id_hashes.get(bytes(gpu_id))
+        return gpu_id
+    
+    def _invalidate_for_events(self, events: List[Dict[str, Any]]):
+        """Drop cached state that the given contract events changed"""
+        for event in events:
+            name = event["event"]
+            if name.startswith("Subnet"):
+                self._subnet_ids_cache = None
                 continue
-                
+            if name == "GPURegistered":
+                self._gpu_ids_cache = None
+            
+            gpu_id = self.resolve_gpu_id(event["args"].get("gpuId"))
+            if gpu_id is None:
+                # Unknown GPU (e.g. registered since the id list was cached)
+                self._gpu_ids_cache = None
+            else:
+                self._gpu_cache.pop(gpu_id, None)
+    
+    async def _multicall(self, contract: Contract, fn_name: str, args: List[Any]) -> List[Optional[tuple]]:
+        """Call a single-argument view function for each arg via Multicall3 tryAggregate
+        
+        Returns the decoded outputs in the order of args; failed calls are None.
+        Falls back to one call per arg if Multicall3 is unavailable.
+        """
+        if not self.multicall3_contract:
+            return await self._call_each(contract, fn_name, args)
+        
+        _, selector, input_types, output_types = self._function_spec(contract, fn_name)
+        _, aggregate_selector, aggregate_input_types, aggregate_output_types = self._function_spec(
+            self.multicall3_contract, "tryAggregate"
+        )
+        multicall_address = self.multicall3_contract.address
+        codec = self.w3.codec
+        
+        async def fetch_batch(batch: List[Any]) -> List[Optional[tuple]]:
+            calls = [(contract.address, selector + codec.encode_abi(input_types, [arg])) for arg in batch]
+            # Raw eth_call + ABI codec: skips web3's per-call middleware and result formatting
+            calldata = aggregate_selector + codec.encode_abi(aggregate_input_types, [False, calls])
             try:
-                new_entries = self.event_filters[event_name].get_new_entries()
-                
-                for entry in new_entries:
-                    events.append({
-                        "event": event_name,
-                        "block_number": entry.blockNumber,
-                        "transaction_hash": entry.transactionHash.hex(),
-                        "args": dict(entry.args),
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    
+                raw = await self._call_with_retries(lambda: self._raw_eth_call(multicall_address, calldata))
+                responses = codec.decode_abi(aggregate_output_types, raw)[0]
+            except Exception as e:
+                logger.warning(f"Multicall3 {fn_name} batch failed, falling back to single calls: {e}")
+                return await self._call_each(contract, fn_name, batch)
+            
+            results: List[Optional[tuple]] = []
+            for arg, (success, data) in zip(batch, responses):
+                if not success:
+                    logger.error(f"{fn_name}({arg}) reverted in Multicall3 batch")
+                    results.append(None)
+                    continue
+                results.append(self._decode_output(output_types, data))
+            return results
+        
+        return await self._gather_batches(fetch_batch, args, self.config.multicall_batch_size)
+    
+    def _function_spec(self, contract: Contract, fn_name: str) -> Tuple[Any, bytes, List[str], List[str]]:
+        """ABI lookup, selector and argument/output types for a function, computed once"""
+        key = (contract.address, fn_name)
+        spec = self._function_specs.get(key)
+        if spec is None:
+            function = contract.get_function_by_name(fn_name)
+            spec = (
+                function,
+                function_abi_to_4byte_selector(function.abi),
+                get_abi_input_types(function.abi),
+                get_abi_output_types(function.abi)
+            )
+            self._function_specs[key] = spec
+        return spec
+    
+    @staticmethod
+    async def _gather_batches(fetch_batch, args: List[Any], batch_size: int) -> List[Optional[tuple]]:
+        """Run fetch_batch over args in chunks concurrently, preserving order"""
+        batches = await asyncio.gather(*(
+            fetch_batch(args[start:start + batch_size]) for start in range(0, len(args), batch_size)
+        ))
+        return [result for batch in batches for result in batch]
+    
+    def _decode_output(self, output_types: List[str], data: bytes) -> tuple:
+        decoded = self.w3.codec.decode_abi(output_types, data)
+        # Same normalization as ContractFunction.call() (e.g. checksummed addresses)
+        return tuple(map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded))
+    
+    async def _call_each(self, contract: Contract, fn_name: str, args: List[Any]) -> List[Optional[tuple]]:
+        """One eth_call per arg, sent as JSON-RPC batches; failed calls are None"""
+        function, selector, input_types, output_types = self._function_spec(contract, fn_name)
+        encode = self.w3.codec.encode_abi
+        
+        async def call_one(arg: Any) -> Optional[tuple]:
+            try:
+                return await self._call_contract_function(function(arg))
+            except Exception as e:
+                logger.error(f"Failed to call {fn_name}({arg}): {e}")
+                return None
+        
+        async def fetch_batch(batch: List[Any]) -> List[Optional[tuple]]:
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": i,
+                    "method": "eth_call",
+                    "params": [{"to": contract.address, "data": "0x" + (selector + encode(input_types, [arg])).hex()}, "latest"]
+                }
+                for i, arg in enumerate(batch)
+            ]
+            try:
+                responses = await asyncio.get_running_loop().run_in_executor(self._executor, self._post_batch, payload)
             except Exception as e:
-                logger.error(f"Failed to get events for {event_name}: {e}")
+                logger.warning(f"JSON-RPC batch for {fn_name} failed, falling back to single calls: {e}")
+                return list(await asyncio.gather(*(call_one(arg) for arg in batch)))
+            
+            # Batch responses may come back in any order
+            by_id = {response.get("id"): response for response in responses}
+            results: List[Optional[tuple]] = []
+            for i, arg in enumerate(batch):
+                response = by_id.get(i, {})
+                if "result" not in response:
+                    logger.error(f"Failed to call {fn_name}({arg}): {response.get('error', 'no response')}")
+                    results.append(None)
+                    continue
+                results.append(self._decode_output(output_types, bytes.fromhex(response["result"][2:])))
+            return results
+        
+        return await self._gather_batches(fetch_batch, args, self.config.rpc_batch_size)
+    
+    def _post_batch(self, payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """POST a JSON-RPC batch over the pooled session (blocking)"""
+        response = self._session.post(self.rpc_url, json=payload, timeout=self.config.request_timeout)
+        response.raise_for_status()
+        responses = response.json()
+        if not isinstance(responses, list):
+            raise ValueError(f"Provider did not return a batch response: {responses}")
+        return responses
+    
+    def _call_cache_middleware(self, make_request, w3):
+        """Web3 middleware serving repeated eth_calls from the current block's cache"""
+        def middleware(method, params):
+            if method != "eth_call":
+                return make_request(method, params)
+            return self._cached_eth_call(params, make_request)
+        return middleware
+    
+    def _cached_eth_call(self, params: List[Any], make_request) -> Dict[str, Any]:
+        """Return a cached eth_call response for params, or make and cache the request"""
+        if len(params) > 1 and params[1] != "latest":
+            return make_request("eth_call", params)
+        
+        # Start a new cache when the block moves on or the current one gets too old
+        now = time.monotonic()
+        cache_block, cache_started = self._call_cache_key
+        if cache_block != self.latest_block or now - cache_started > self.config.call_cache_ttl:
+            self._call_cache = {}
+            self._call_cache_key = (self.latest_block, now)
+        cache = self._call_cache
         
-        return sorted(events, key=lambda x: x["block_number"])
+        key = json.dumps(params, sort_keys=True, default=str)
+        response = cache.get(key)
+        if response is None:
+            response = make_request("eth_call", params)
+            if "error" not in response:
+                cache[key] = response
+        return response
+    
+    def _raw_eth_call(self, to: str, data: bytes) -> bytes:
+        """eth_call straight through the provider, bypassing the middleware stack (blocking)"""
+        response = self._cached_eth_call(
+            [{"to": to, "data": "0x" + data.hex()}, "latest"], self.w3.provider.make_request
+        )
+        if "error" in response:
+            raise ValueError(response["error"])
+        return bytes.fromhex(response["result"][2:])
     
     async def _call_contract_function(self, function_call, max_retries: int = None):
         """Call contract function with retry logic"""
+        return await self._call_with_retries(function_call.call, max_retries)
+    
+    async def _call_with_retries(self, blocking_call, max_retries: int = None):
+        """Run a blocking RPC call on the RPC pool with backoff and the circuit breaker"""
         max_retries = max_retries or self.config.max_retries
+        loop = asyncio.get_running_loop()
+        
+        if time.monotonic() < self._circuit_open_until:
+            raise ConnectionError("Avalanche RPC circuit breaker is open")
         
         for attempt in range(max_retries):
+            if self._shutdown.is_set():
+                return None
             try:
-                return function_call.call()
+                # Blocking HTTP; run it on the bounded RPC pool
+                result = await loop.run_in_executor(self._executor, blocking_call)
+                # A successful call closes the breaker's count and restores the connection state
+                self._consecutive_failures = 0
+                self.is_connected_flag = True
+                return result
+            except asyncio.CancelledError:
+                # Queued work dropped by disconnect(), as opposed to this task being cancelled
+                if self._shutdown.is_set() and not asyncio.current_task().cancelling():
+                    return None
+                raise
             except Exception as e:
+                if self._shutdown.is_set():
+                    return None
                 if attempt == max_retries - 1:
+                    self._record_failure()
                     raise e
                 
                 logger.warning(f"Contract call attempt {attempt + 1} failed: {e}")
-                await asyncio.sleep(self.config.retry_delay)
+                # Exponential backoff with jitter so concurrent callers don't retry in lockstep;
+                # disconnect() cuts the wait short
+                delay = min(self.config.max_retry_delay, self.config.retry_delay * (2 ** attempt))
+                try:
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=delay + random.uniform(0, 0.5))
+                except asyncio.TimeoutError:
+                    pass
         
         return None
     
+    def _record_failure(self):
+        """Count a call that exhausted its retries; open the circuit after too many in a row"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.config.circuit_breaker_threshold:
+            self.is_connected_flag = False
+            self._circuit_open_until = time.monotonic() + self.config.circuit_breaker_cooldown
+            logger.error(
+                f"{self._consecutive_failures} consecutive contract call failures, "
+                f"pausing calls for {self.config.circuit_breaker_cooldown}s"
+            )
+    
     async def disconnect(self):
         """Disconnect from blockchain"""
+        # Stop retries and drop queued RPC work before tearing the client down
+        self._shutdown.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
         self.is_connected_flag = False
         self.w3 = None
         self.eryza_token_contract = None
         self.gpu_subnet_manager_contract = None
-        self.event_filters = {}
+        self.multicall3_contract = None
+        self._function_specs.clear()
+        self._call_cache = {}
+        self._last_scanned_block = None
+        if self._subscription_task:
+            self._subscription_task.cancel()
+            self._subscription_task = None
+        self._event_queue.clear()
+        self._gpu_ids_cache = None
+        self._subnet_ids_cache = None
+        self._gpu_cache.clear()
         logger.info("Disconnected from Avalanche blockchain")
 
 # Global instance
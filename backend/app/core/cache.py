@@ -0,0 +1,146 @@
+import functools
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "eryzaa:response:"
+STALE_SUFFIX = ":stale"
+STALE_TTL = 24 * 3600  # How long the last good response is kept as a fallback
+
+class ResponseCache:
+    """Short-TTL cache for read-mostly endpoint responses
+
+    Uses Redis when REDIS_URL is set so every worker shares one cache, otherwise an
+    in-process dict. Each entry also keeps a long-lived stale copy that is served if
+    the endpoint fails.
+    """
+
+    def __init__(self, redis_url: str = ""):
+        self._redis = aioredis.from_url(redis_url) if (aioredis and redis_url) else None
+        self._local: Dict[str, Tuple[float, str]] = {}
+
+    async def _get(self, key: str) -> Optional[str]:
+        if self._redis:
+            try:
+                value = await self._redis.get(key)
+                return value.decode() if value is not None else None
+            except Exception as e:
+                logger.warning(f"Response cache read failed: {e}")
+                return None
+        entry = self._local.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    async def _set(self, key: str, value: str, ttl: float):
+        if self._redis:
+            try:
+                await self._redis.set(key, value, px=int(ttl * 1000))
+            except Exception as e:
+                logger.warning(f"Response cache write failed: {e}")
+            return
+        self._local[key] = (time.monotonic() + ttl, value)
+
+    async def get(self, name: str) -> Optional[str]:
+        """Cached JSON body for name, if still fresh"""
+        return await self._get(KEY_PREFIX + name)
+
+    async def get_stale(self, name: str) -> Optional[str]:
+        """Last JSON body stored for name, however old"""
+        return await self._get(KEY_PREFIX + name + STALE_SUFFIX)
+
+    async def set(self, name: str, payload: str, ttl: float):
+        await self._set(KEY_PREFIX + name, payload, ttl)
+        await self._set(KEY_PREFIX + name + STALE_SUFFIX, payload, STALE_TTL)
+
+    async def invalidate(self, *names: str):
+        """Drop the fresh entries; stale fallbacks are kept"""
+        keys = [KEY_PREFIX + name for name in names]
+        if self._redis:
+            try:
+                await self._redis.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Response cache invalidation failed: {e}")
+            return
+        for key in keys:
+            self._local.pop(key, None)
+
+response_cache = ResponseCache(settings.REDIS_URL)
+
+def _json_response(payload: str) -> Response:
+    return Response(content=payload, media_type="application/json")
+
+def cached_response(name: str, expire: float) -> Callable:
+    """Serve an endpoint from response_cache for `expire` seconds
+
+    Hits are returned as the stored JSON body without re-encoding. Streaming responses
+    are passed through chunk by chunk and cached once their body has been fully sent.
+    If the endpoint fails with a server error before any of the body is sent, the last
+    good response is returned instead.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            hit = await response_cache.get(name)
+            if hit is not None:
+                return _json_response(hit)
+            try:
+                result = await func(*args, **kwargs)
+                if isinstance(result, StreamingResponse):
+                    # Nothing has been sent yet, so a failure here can still fall back
+                    first = await anext(result.body_iterator, None)
+            except HTTPException as e:
+                if e.status_code < 500:
+                    raise
+                stale = await _stale_response(name, e.detail)
+                if stale is None:
+                    raise
+                return stale
+            except Exception as e:
+                stale = await _stale_response(name, e)
+                if stale is None:
+                    raise
+                return stale
+            if isinstance(result, StreamingResponse):
+                result.body_iterator = _tee_into_cache(name, first, result.body_iterator, expire)
+            else:
+                await response_cache.set(name, json.dumps(jsonable_encoder(result)), expire)
+            return result
+        return wrapper
+    return decorator
+
+async def _stale_response(name: str, reason: Any) -> Optional[Response]:
+    stale = await response_cache.get_stale(name)
+    if stale is None:
+        return None
+    logger.warning(f"Serving stale {name} response: {reason}")
+    return _json_response(stale)
+
+async def _tee_into_cache(name: str, first: Any, body: AsyncIterator[Any], expire: float) -> AsyncIterator[Any]:
+    """Pass a streamed body through, then cache it once complete
+
+    An error or disconnect part-way leaves the cache untouched.
+    """
+    chunks = []
+    if first is not None:
+        chunks.append(first)
+        yield first
+    async for chunk in body:
+        chunks.append(chunk)
+        yield chunk
+    payload = b"".join(chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks)
+    await response_cache.set(name, payload.decode(), expire)
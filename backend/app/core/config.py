@@ -18,6 +18,13 @@ class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./eryzaa.db")
     
+    # Per-request query count check (dev/test only; logs requests above the limit)
+    QUERY_COUNT_CHECK: bool = os.getenv("QUERY_COUNT_CHECK", "false").lower() == "true"
+    MAX_QUERIES_PER_REQUEST: int = int(os.getenv("MAX_QUERIES_PER_REQUEST", "10"))
+    
+    # Cache (empty means an in-process cache per worker)
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+    
     # Blockchain
     AVALANCHE_RPC_URL: str = os.getenv("AVALANCHE_RPC_URL", "https://api.avax-test.network/ext/bc/C/rpc")
     PRIVATE_KEY: str = os.getenv("PRIVATE_KEY", "")
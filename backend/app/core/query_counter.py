@@ -0,0 +1,58 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class QueryCounter:
+    """Number of SQL statements executed while the counter is active"""
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+_current: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    # Registered on the Engine class, so it also sees async engines' underlying sync engine
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count the queries executed in this context (including threadpool work it spawns)"""
+    counter = QueryCounter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+class QueryCountMiddleware:
+    """Log requests that execute more than max_queries statements (N+1 guard for dev/test)
+
+    Plain ASGI rather than BaseHTTPMiddleware so queries issued while a streaming
+    response body is being sent are counted too.
+    """
+
+    def __init__(self, app, max_queries: int):
+        self.app = app
+        self.max_queries = max_queries
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with count_queries() as counter:
+            await self.app(scope, receive, send)
+        if counter.count > self.max_queries:
+            logger.warning(
+                f"{scope['method']} {scope['path']} executed {counter.count} queries "
+                f"(limit {self.max_queries})"
+            )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,11 +23,14 @@ class NodeStatus(str, enum.Enum):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_node_status", "node_id", "status"),
+    )
     
     id = Column(String, primary_key=True, index=True)
     client_id = Column(String, index=True)
     node_id = Column(String, ForeignKey("compute_nodes.id"), nullable=True)
-    status = Column(String, default=JobStatus.PENDING)
+    status = Column(String, default=JobStatus.PENDING, index=True)
     payment_amount = Column(Float)
     ssh_username = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -44,7 +47,7 @@ class ComputeNode(Base):
     id = Column(String, primary_key=True, index=True)
     ip_address = Column(String, index=True)
     zerotier_ip = Column(String, nullable=True)
-    status = Column(String, default=NodeStatus.ACTIVE)
+    status = Column(String, default=NodeStatus.ACTIVE, index=True)
     capabilities = Column(JSON, nullable=True)
     pricing = Column(JSON, nullable=True)
     last_seen = Column(DateTime(timezone=True), server_default=func.now())
@@ -5,19 +5,20 @@ Now integrated with Avalanche blockchain for real data
 """
 
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import asyncio
 import json
 import logging
-from dataclasses import dataclass, asdict
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+import random
+import time
+import zlib
+from dataclasses import dataclass, replace
 
 try:
-    from app.core.database import SessionLocal
+    from app.core.database import AsyncSessionLocal
 except ImportError:
-    SessionLocal = None
+    AsyncSessionLocal = None
 
 try:
     from app.core.avalanche_blockchain import avalanche_blockchain_manager
@@ -26,7 +27,12 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# GPU health thresholds
+GPU_WARNING_TEMPERATURE = 85
+GPU_CRITICAL_TEMPERATURE = 90
+GPU_HIGH_POWER_DRAW = 400
+
+@dataclass(slots=True)
 class GPUMetrics:
     """GPU performance metrics"""
     gpu_id: str
@@ -41,11 +47,20 @@ class GPUMetrics:
     current_subnet: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['last_updated'] = self.last_updated.isoformat()
-        return data
+        return {
+            "gpu_id": self.gpu_id,
+            "utilization": self.utilization,
+            "temperature": self.temperature,
+            "power_draw": self.power_draw,
+            "memory_used": self.memory_used,
+            "memory_total": self.memory_total,
+            "compute_power": self.compute_power,
+            "last_updated": self.last_updated.isoformat(),
+            "is_rented": self.is_rented,
+            "current_subnet": self.current_subnet
+        }
 
-@dataclass
+@dataclass(slots=True)
 class SubnetMetrics:
     """Subnet performance and status metrics"""
     subnet_id: str
@@ -61,11 +76,21 @@ class SubnetMetrics:
     purpose: str
     
     def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['created_at'] = self.created_at.isoformat()
-        return data
+        return {
+            "subnet_id": self.subnet_id,
+            "coordinator": self.coordinator,
+            "gpu_count": self.gpu_count,
+            "total_compute": self.total_compute,
+            "total_memory": self.total_memory,
+            "avg_utilization": self.avg_utilization,
+            "avg_temperature": self.avg_temperature,
+            "total_power_draw": self.total_power_draw,
+            "active": self.active,
+            "created_at": self.created_at.isoformat(),
+            "purpose": self.purpose
+        }
 
-@dataclass
+@dataclass(slots=True)
 class SystemMetrics:
     """Overall system metrics"""
     total_gpus: int
@@ -79,19 +104,37 @@ class SystemMetrics:
     last_updated: datetime
     
     def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data['last_updated'] = self.last_updated.isoformat()
-        return data
+        return {
+            "total_gpus": self.total_gpus,
+            "rented_gpus": self.rented_gpus,
+            "available_gpus": self.available_gpus,
+            "active_subnets": self.active_subnets,
+            "total_compute_power": self.total_compute_power,
+            "total_memory": self.total_memory,
+            "avg_system_utilization": self.avg_system_utilization,
+            "blockchain_connected": self.blockchain_connected,
+            "last_updated": self.last_updated.isoformat()
+        }
 
 class GPUMonitoringService:
     """Service for monitoring GPU resources and subnets"""
     
     def __init__(self):
-        self.gpu_metrics: Dict[str, GPUMetrics] = {}
+        self.gpu_metrics: Dict[str, GPUMetrics] = {}  # Write through _set_gpu
         self.subnet_metrics: Dict[str, SubnetMetrics] = {}
         self.system_metrics: Optional[SystemMetrics] = None
         self.monitoring_active = False
-        self.update_interval = 30  # seconds
+        # Full re-fetch backstop; contract events drive updates in between
+        self.update_interval = int(os.getenv("GPU_POLL_INTERVAL_SECONDS", "60"))
+        # Set when events change data that the subnet/system aggregates derive from
+        self._dirty = asyncio.Event()
+        # Chain reads keyed by block height, shared by every update within one block
+        self._chain_cache: Dict[str, Any] = {"block": None, "gpus": None, "subnets": None}
+        self._chain_lock = asyncio.Lock()
+        # Per-GPU simulation RNGs with their stable base seed
+        self._rng_cache: Dict[str, Tuple[int, random.Random]] = {}
+        # Running system totals over gpu_metrics, kept current by _set_gpu
+        self._sys_accum: Dict[str, float] = {"rented": 0, "total_compute": 0.0, "total_memory": 0.0, "total_util": 0.0}
         
     async def start_monitoring(self):
         """Start the monitoring service"""
@@ -115,9 +158,7 @@ class GPUMonitoringService:
         self.monitoring_active = True
         
         # Start monitoring tasks
-        asyncio.create_task(self._monitor_gpu_metrics())
-        asyncio.create_task(self._monitor_subnet_metrics())
-        asyncio.create_task(self._monitor_system_metrics())
+        asyncio.create_task(self._reconcile_metrics())
         asyncio.create_task(self._monitor_blockchain_events())
         
     async def stop_monitoring(self):
@@ -125,35 +166,61 @@ class GPUMonitoringService:
         self.monitoring_active = False
         logger.info("Stopping GPU monitoring service...")
         
-    async def _monitor_gpu_metrics(self):
-        """Monitor individual GPU metrics"""
-        while self.monitoring_active:
-            try:
-                await self._update_gpu_metrics()
-                await asyncio.sleep(self.update_interval)
-            except Exception as e:
-                logger.error(f"Error updating GPU metrics: {e}")
-                await asyncio.sleep(5)
-                
-    async def _monitor_subnet_metrics(self):
-        """Monitor subnet metrics"""
+    async def _reconcile_metrics(self):
+        """Recompute subnet and system metrics when events mark them dirty
+        
+        Without events, does a full re-fetch every update_interval as a backstop.
+        """
+        full_refresh = True  # Initial load
         while self.monitoring_active:
             try:
+                if full_refresh:
+                    await self._update_gpu_metrics()
                 await self._update_subnet_metrics()
-                await asyncio.sleep(self.update_interval)
-            except Exception as e:
-                logger.error(f"Error updating subnet metrics: {e}")
-                await asyncio.sleep(5)
-                
-    async def _monitor_system_metrics(self):
-        """Monitor overall system metrics"""
-        while self.monitoring_active:
-            try:
                 await self._update_system_metrics()
-                await asyncio.sleep(self.update_interval)
             except Exception as e:
-                logger.error(f"Error updating system metrics: {e}")
-                await asyncio.sleep(5)
+                logger.error(f"Error reconciling metrics: {e}")
+            
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.update_interval)
+                full_refresh = False
+            except asyncio.TimeoutError:
+                full_refresh = True
+            self._dirty.clear()
+    
+    async def _chain_data(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """All GPU ("gpus") or subnet ("subnets") data for the latest known block
+        
+        The block height comes from the manager's last RPC, so checking it costs nothing.
+        """
+        async with self._chain_lock:
+            block = avalanche_blockchain_manager.latest_block
+            if block != self._chain_cache["block"]:
+                self._chain_cache = {"block": block, "gpus": None, "subnets": None}
+            if self._chain_cache[key] is None:
+                if key == "gpus":
+                    self._chain_cache[key] = await avalanche_blockchain_manager.get_all_gpu_data()
+                else:
+                    self._chain_cache[key] = await avalanche_blockchain_manager.get_all_subnet_data()
+            return self._chain_cache[key]
+    
+    def _invalidate_chain_cache(self):
+        self._chain_cache = {"block": None, "gpus": None, "subnets": None}
+    
+    def _set_gpu(self, gpu_metrics: GPUMetrics):
+        """Store a GPU's metrics and adjust the running system totals by the difference"""
+        accum = self._sys_accum
+        old = self.gpu_metrics.get(gpu_metrics.gpu_id)
+        if old:
+            accum["rented"] -= old.is_rented
+            accum["total_compute"] -= old.compute_power
+            accum["total_memory"] -= old.memory_total
+            accum["total_util"] -= old.utilization
+        accum["rented"] += gpu_metrics.is_rented
+        accum["total_compute"] += gpu_metrics.compute_power
+        accum["total_memory"] += gpu_metrics.memory_total
+        accum["total_util"] += gpu_metrics.utilization
+        self.gpu_metrics[gpu_metrics.gpu_id] = gpu_metrics
     
     async def _update_gpu_metrics(self):
         """Update GPU performance metrics from Avalanche blockchain"""
@@ -165,18 +232,23 @@ class GPUMonitoringService:
                 return
                 
             # Fetch real GPU data from smart contracts
-            gpu_data = await avalanche_blockchain_manager.get_all_gpu_data()
+            gpu_data = await self._chain_data("gpus")
             
             if not gpu_data:
                 logger.warning("No GPU data from blockchain, using fallback")
                 await self._update_gpu_metrics_fallback()
                 return
             
+            # Get additional metrics (in production, these would come from GPU monitoring agents),
+            # querying every GPU concurrently
+            gpu_ids = list(gpu_data)
+            all_additional_metrics = await asyncio.gather(
+                *(self._get_gpu_performance_metrics(gpu_id) for gpu_id in gpu_ids)
+            )
+            
             # Process blockchain GPU data
-            for gpu_id, gpu_info in gpu_data.items():
-                # Get additional metrics (in production, these would come from GPU monitoring agents)
-                additional_metrics = await self._get_gpu_performance_metrics(gpu_id)
-                
+            for gpu_id, additional_metrics in zip(gpu_ids, all_additional_metrics):
+                gpu_info = gpu_data[gpu_id]
                 gpu_metrics = GPUMetrics(
                     gpu_id=gpu_id,
                     utilization=additional_metrics.get("utilization", 0.0),
@@ -189,7 +261,7 @@ class GPUMonitoringService:
                     current_subnet=gpu_info.get("current_subnet"),
                     last_updated=datetime.now()
                 )
-                self.gpu_metrics[gpu_id] = gpu_metrics
+                self._set_gpu(gpu_metrics)
                 
             logger.info(f"Updated metrics for {len(gpu_data)} GPUs from Avalanche blockchain")
             
@@ -249,7 +321,7 @@ class GPUMonitoringService:
                 current_subnet=gpu_data["current_subnet"],
                 last_updated=datetime.now()
             )
-            self.gpu_metrics[gpu_data["gpu_id"]] = gpu_metrics
+            self._set_gpu(gpu_metrics)
             
         logger.debug(f"Updated fallback metrics for {len(simulated_gpus)} GPUs")
     
@@ -259,23 +331,23 @@ class GPUMonitoringService:
         # For now, simulate performance metrics based on blockchain data
         
         try:
-            # Simulate different performance levels
-            import hashlib
-            import random
-            
-            # Use GPU ID as seed for consistent "performance"
-            seed = int(hashlib.md5(gpu_id.encode()).hexdigest()[:8], 16)
-            random.seed(seed + int(datetime.now().timestamp()) // 60)  # Change every minute
+            # Use GPU ID as seed for consistent "performance"; crc32 is stable across
+            # processes, unlike hash(), so every worker simulates the same values
+            cached = self._rng_cache.get(gpu_id)
+            if cached is None:
+                cached = self._rng_cache[gpu_id] = (zlib.crc32(gpu_id.encode()), random.Random())
+            seed, rng = cached
+            rng.seed(seed + int(time.time()) // 60)  # Change every minute
             
             # Simulate realistic GPU metrics
-            base_utilization = random.uniform(30, 95)
-            base_temperature = random.uniform(55, 85)
+            base_utilization = rng.uniform(30, 95)
+            base_temperature = rng.uniform(55, 85)
             
             return {
                 "utilization": base_utilization,
                 "temperature": base_temperature,
                 "power_draw": 250 + (base_utilization * 2.5),  # Power scales with utilization
-                "memory_used": random.uniform(8, 22)  # Memory usage varies
+                "memory_used": rng.uniform(8, 22)  # Memory usage varies
             }
             
         except Exception as e:
@@ -297,7 +369,7 @@ class GPUMonitoringService:
                 return
                 
             # Fetch real subnet data from smart contracts
-            subnet_data = await avalanche_blockchain_manager.get_all_subnet_data()
+            subnet_data = await self._chain_data("subnets")
             
             if not subnet_data:
                 logger.warning("No subnet data from blockchain, using fallback")
@@ -344,48 +416,46 @@ class GPUMonitoringService:
     
     async def _update_subnet_metrics_fallback(self):
         """Fallback subnet metrics when blockchain is unavailable"""
-        # Aggregate GPU metrics by subnet (fallback method)
-        subnet_data = {}
-        
-        for gpu_id, gpu_metrics in self.gpu_metrics.items():
-            if gpu_metrics.current_subnet:
-                subnet_id = gpu_metrics.current_subnet
-                if subnet_id not in subnet_data:
-                    subnet_data[subnet_id] = {
-                        "gpus": [],
-                        "total_compute": 0,
-                        "total_memory": 0,
-                        "total_utilization": 0,
-                        "total_temperature": 0,
-                        "total_power": 0
-                    }
-                
-                subnet_info = subnet_data[subnet_id]
-                subnet_info["gpus"].append(gpu_metrics)
-                subnet_info["total_compute"] += gpu_metrics.compute_power
-                subnet_info["total_memory"] += gpu_metrics.memory_total
-                subnet_info["total_utilization"] += gpu_metrics.utilization
-                subnet_info["total_temperature"] += gpu_metrics.temperature
-                subnet_info["total_power"] += gpu_metrics.power_draw
+        # Aggregate GPU metrics by subnet (fallback method) in a single pass
+        subnet_data: Dict[str, Dict[str, float]] = {}
+        for gpu_metrics in self.gpu_metrics.values():
+            subnet_id = gpu_metrics.current_subnet
+            if not subnet_id:
+                continue
+            subnet_info = subnet_data.get(subnet_id)
+            if subnet_info is None:
+                subnet_info = subnet_data[subnet_id] = {
+                    "gpu_count": 0,
+                    "total_compute": 0,
+                    "total_memory": 0,
+                    "total_utilization": 0,
+                    "total_temperature": 0,
+                    "total_power": 0
+                }
+            subnet_info["gpu_count"] += 1
+            subnet_info["total_compute"] += gpu_metrics.compute_power
+            subnet_info["total_memory"] += gpu_metrics.memory_total
+            subnet_info["total_utilization"] += gpu_metrics.utilization
+            subnet_info["total_temperature"] += gpu_metrics.temperature
+            subnet_info["total_power"] += gpu_metrics.power_draw
         
         # Create subnet metrics
         for subnet_id, data in subnet_data.items():
-            gpu_count = len(data["gpus"])
-            if gpu_count > 0:
-                subnet_metrics = SubnetMetrics(
-                    subnet_id=subnet_id,
-                    coordinator="0x1234...5678",  # Fallback coordinator
-                    gpu_count=gpu_count,
-                    total_compute=data["total_compute"],
-                    total_memory=data["total_memory"],
-                    avg_utilization=data["total_utilization"] / gpu_count,
-                    avg_temperature=data["total_temperature"] / gpu_count,
-                    total_power_draw=data["total_power"],
-                    active=True,
-                    created_at=datetime.now() - timedelta(hours=2),  # Simulated
-                    purpose="ML Training" if "training" in subnet_id else "Inference"
-                )
-                self.subnet_metrics[subnet_id] = subnet_metrics
+            gpu_count = data["gpu_count"]
+            subnet_metrics = SubnetMetrics(
+                subnet_id=subnet_id,
+                coordinator="0x1234...5678",  # Fallback coordinator
+                gpu_count=gpu_count,
+                total_compute=data["total_compute"],
+                total_memory=data["total_memory"],
+                avg_utilization=data["total_utilization"] / gpu_count,
+                avg_temperature=data["total_temperature"] / gpu_count,
+                total_power_draw=data["total_power"],
+                active=True,
+                created_at=datetime.now() - timedelta(hours=2),  # Simulated
+                purpose="ML Training" if "training" in subnet_id else "Inference"
+            )
+            self.subnet_metrics[subnet_id] = subnet_metrics
         
         logger.debug(f"Updated fallback metrics for {len(subnet_data)} subnets")
     
@@ -400,17 +470,18 @@ class GPUMonitoringService:
                 blockchain_connected = True
                 blockchain_stats = await avalanche_blockchain_manager.get_system_stats()
             
-            # Calculate metrics from current data
+            # Calculate metrics from the running totals kept by _set_gpu
+            accum = self._sys_accum
             total_gpus = len(self.gpu_metrics)
-            rented_gpus = sum(1 for gpu in self.gpu_metrics.values() if gpu.is_rented)
+            rented_gpus = int(accum["rented"])
             available_gpus = total_gpus - rented_gpus
             active_subnets = len(self.subnet_metrics)
             
-            total_compute = sum(gpu.compute_power for gpu in self.gpu_metrics.values())
-            total_memory = sum(gpu.memory_total for gpu in self.gpu_metrics.values())
+            total_compute = accum["total_compute"]
+            total_memory = accum["total_memory"]
             
             if total_gpus > 0:
-                avg_utilization = sum(gpu.utilization for gpu in self.gpu_metrics.values()) / total_gpus
+                avg_utilization = accum["total_util"] / total_gpus
             else:
                 avg_utilization = 0.0
             
@@ -439,9 +510,12 @@ class GPUMonitoringService:
                 if avalanche_blockchain_manager and avalanche_blockchain_manager.is_connected():
                     # Get recent blockchain events
                     events = await avalanche_blockchain_manager.get_recent_events()
+                    if events:
+                        # Events in the current block would otherwise be masked by cached reads
+                        self._invalidate_chain_cache()
                     
-                    for event in events:
-                        await self._process_blockchain_event(event)
+                    # Events refresh independent GPUs from one shared chain snapshot
+                    await asyncio.gather(*(self._process_blockchain_event(event) for event in events))
                         
                 await asyncio.sleep(10)  # Check for events every 10 seconds
                 
@@ -455,30 +529,36 @@ class GPUMonitoringService:
             event_type = event.get("event")
             event_args = event.get("args", {})
             
+            gpu_id = avalanche_blockchain_manager.resolve_gpu_id(event_args.get("gpuId")) if avalanche_blockchain_manager else None
+            
             if event_type == "GPURegistered":
-                logger.info(f"New GPU registered: {event_args.get('gpuId')}")
-                # Trigger immediate GPU metrics update
-                await self._update_gpu_metrics()
+                logger.info(f"New GPU registered: {gpu_id or event_args.get('gpuId')}")
+                if gpu_id:
+                    await self._update_specific_gpu_metrics(gpu_id)
+                else:
+                    # Not in the cached id list yet; the next reconcile re-fetches everything
+                    await self._update_gpu_metrics()
                 
-            elif event_type == "GPURented":
-                logger.info(f"GPU rented: {event_args.get('gpuId')} by {event_args.get('renter')}")
-                # Trigger immediate GPU and system metrics update
-                await self._update_gpu_metrics()
-                await self._update_system_metrics()
+            elif event_type in ("GPURented", "GPURentalEnded", "GPUAddedToSubnet", "GPURemovedFromSubnet"):
+                logger.info(f"{event_type}: {gpu_id or event_args.get('gpuId')}")
+                if gpu_id:
+                    await self._update_specific_gpu_metrics(gpu_id)
                 
-            elif event_type == "SubnetCreated":
-                logger.info(f"New subnet created: {event_args.get('subnetId')}")
-                # Trigger immediate subnet metrics update
-                await self._update_subnet_metrics()
-                await self._update_system_metrics()
+            elif event_type in ("SubnetCreated", "SubnetDissolved"):
+                logger.info(f"{event_type}: {event_args.get('subnetId')}")
                 
             elif event_type == "GPUMetricsUpdated":
-                logger.debug(f"GPU metrics updated: {event_args.get('gpuId')}")
+                logger.debug(f"GPU metrics updated: {gpu_id}")
                 # Update specific GPU metrics
-                gpu_id = event_args.get("gpuId")
                 if gpu_id:
                     await self._update_specific_gpu_metrics(gpu_id)
             
+            else:
+                return
+            
+            # Subnet and system aggregates are recomputed once by _reconcile_metrics
+            self._dirty.set()
+            
         except Exception as e:
             logger.error(f"Failed to process blockchain event: {e}")
     
@@ -489,7 +569,7 @@ class GPUMonitoringService:
                 return
             
             # Get specific GPU data from blockchain
-            all_gpu_data = await avalanche_blockchain_manager.get_all_gpu_data()
+            all_gpu_data = await self._chain_data("gpus")
             gpu_info = all_gpu_data.get(gpu_id)
             
             if gpu_info:
@@ -507,7 +587,7 @@ class GPUMonitoringService:
                     current_subnet=gpu_info.get("current_subnet"),
                     last_updated=datetime.now()
                 )
-                self.gpu_metrics[gpu_id] = gpu_metrics
+                self._set_gpu(gpu_metrics)
                 logger.debug(f"Updated specific metrics for GPU {gpu_id}")
                 
         except Exception as e:
@@ -533,6 +613,18 @@ class GPUMonitoringService:
         """Get overall system metrics"""
         return self.system_metrics.to_dict() if self.system_metrics else {}
     
+    def get_gpu_health_counts(self) -> Dict[str, int]:
+        """Count GPUs per temperature health bucket without serializing their metrics"""
+        healthy = warning = critical = 0
+        for gpu_metric in self.gpu_metrics.values():
+            if gpu_metric.temperature > GPU_CRITICAL_TEMPERATURE:
+                critical += 1
+            elif gpu_metric.temperature > GPU_WARNING_TEMPERATURE:
+                warning += 1
+            else:
+                healthy += 1
+        return {"healthy": healthy, "warning": warning, "critical": critical}
+    
     def get_gpu_health_status(self, gpu_id: str) -> Dict[str, Any]:
         """Get health status for a specific GPU"""
         gpu_metric = self.gpu_metrics.get(gpu_id)
@@ -543,18 +635,19 @@ class GPUMonitoringService:
         health_status = "healthy"
         warnings = []
         
-        if gpu_metric.temperature > 85:
-            health_status = "warning"
-            warnings.append("High temperature")
-        elif gpu_metric.temperature > 90:
+        if gpu_metric.temperature > GPU_CRITICAL_TEMPERATURE:
             health_status = "critical"
             warnings.append("Critical temperature")
+        elif gpu_metric.temperature > GPU_WARNING_TEMPERATURE:
+            health_status = "warning"
+            warnings.append("High temperature")
         
         if gpu_metric.utilization == 0 and gpu_metric.is_rented:
-            health_status = "warning"
+            if health_status == "healthy":
+                health_status = "warning"
             warnings.append("No utilization despite being rented")
         
-        if gpu_metric.power_draw > 400:
+        if gpu_metric.power_draw > GPU_HIGH_POWER_DRAW:
             warnings.append("High power consumption")
         
         return {
@@ -593,11 +686,14 @@ class GPUMonitoringService:
         """Simulate updating GPU metrics (for testing)"""
         if gpu_id in self.gpu_metrics:
             gpu_metric = self.gpu_metrics[gpu_id]
-            gpu_metric.utilization = metrics.get("utilization", gpu_metric.utilization)
-            gpu_metric.temperature = metrics.get("temperature", gpu_metric.temperature)
-            gpu_metric.power_draw = metrics.get("power_draw", gpu_metric.power_draw)
-            gpu_metric.memory_used = metrics.get("memory_used", gpu_metric.memory_used)
-            gpu_metric.last_updated = datetime.now()
+            self._set_gpu(replace(
+                gpu_metric,
+                utilization=metrics.get("utilization", gpu_metric.utilization),
+                temperature=metrics.get("temperature", gpu_metric.temperature),
+                power_draw=metrics.get("power_draw", gpu_metric.power_draw),
+                memory_used=metrics.get("memory_used", gpu_metric.memory_used),
+                last_updated=datetime.now()
+            ))
 
 # Global monitoring service instance
 gpu_monitoring_service = GPUMonitoringService()
\ No newline at end of file
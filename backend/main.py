@@ -7,37 +7,46 @@ import logging
 from typing import Optional
 
 from app.core.config import settings
-from app.core.database import engine, SessionLocal
+from app.core.database import async_engine, create_missing_indexes
 from app.models import models
 from app.api.v1.api import api_router
+from app.api.v1 import monitoring
 from app.core.blockchain import blockchain_manager
 from app.core.scheduler import job_scheduler
 from app.core.logger import setup_logging
+from app.core.query_counter import QueryCountMiddleware
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
     logger.info("Starting Eryza Backend API...")
     
+    # Create database tables
+    async with async_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes, models.Base.metadata)
+    
     # Initialize blockchain connection
     await blockchain_manager.initialize()
     
     # Start job scheduler
     await job_scheduler.start()
     
+    # Start the shared monitoring broadcast pollers
+    monitoring.start_pollers()
+    
     logger.info("✅ Eryza Backend API started successfully")
     yield
     
     # Cleanup
     logger.info("Shutting down Eryza Backend API...")
+    await monitoring.stop_pollers()
     await job_scheduler.stop()
+    await async_engine.dispose()
     logger.info("✅ Eryza Backend API shut down complete")
 
 # Create FastAPI app
@@ -59,6 +68,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Flag N+1 regressions in dev/test
+if settings.QUERY_COUNT_CHECK:
+    app.add_middleware(QueryCountMiddleware, max_queries=settings.MAX_QUERIES_PER_REQUEST)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -0,0 +1,33 @@
+#!/bin/bash
+
+# ================================================
+# 🚀 ERYZAA RENTAL API SERVER
+# ================================================
+# Runs api_server:app under gunicorn with uvicorn workers.
+#
+# Rentals and WebSocket broadcasts are shared between workers through
+# REDIS_URL. Without it each worker keeps its own in-memory rentals, so
+# only a single worker is started.
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+cd "$SCRIPT_DIR"
+
+if [ -n "$REDIS_URL" ]; then
+    WORKERS="${API_WORKERS:-$((2 * $(nproc) + 1))}"
+else
+    WORKERS="${API_WORKERS:-1}"
+    if [ "$WORKERS" -gt 1 ]; then
+        echo "API_WORKERS=$WORKERS needs REDIS_URL to share rentals between workers" >&2
+        exit 1
+    fi
+fi
+BIND="${API_BIND:-0.0.0.0:8000}"
+
+exec gunicorn api_server:app \
+    -k uvicorn.workers.UvicornWorker \
+    -w "$WORKERS" \
+    --worker-connections 1000 \
+    -b "$BIND" \
+    --log-level warning
@@ -1,4 +1,5 @@
 import pytest
+from contextlib import contextmanager
 
 @pytest.fixture(scope='session')
 def blockchain_setup():
@@ -10,4 +11,20 @@ def blockchain_setup():
 def backend_setup():
     # Setup code for backend connection
     yield
-    # Teardown code for backend connection
\ No newline at end of file
+    # Teardown code for backend connection
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail if the wrapped block executes more SQL statements than allowed
+
+    with assert_max_queries(3):
+        client.get("/api/v1/display/active-jobs")
+    """
+    from app.core.query_counter import count_queries
+
+    @contextmanager
+    def _assert_max_queries(limit):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, f"Expected at most {limit} queries, got {counter.count}"
+    return _assert_max_queries
@@ -0,0 +1,89 @@
+"""
+Query-count guards for the job display endpoints
+Each endpoint must issue a fixed number of SQL statements, not one per row
+"""
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints import jobs_display
+from app.core.cache import response_cache
+from app.core.database import get_async_db
+from app.models.models import Base, ComputeNode, Job
+
+# More nodes than one streamed batch, so per-batch queries are exercised
+NODE_COUNT = jobs_display.STREAM_BATCH_SIZE + 50
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'display.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        for i in range(NODE_COUNT):
+            db.add(ComputeNode(
+                id=f"node-{i}", ip_address=f"10.0.{i // 256}.{i % 256}",
+                status="busy" if i % 2 else "active", capabilities={}, pricing={}
+            ))
+            db.add(Job(
+                id=f"job-{i}", client_id=f"client-{i}", node_id=f"node-{i}",
+                status="running" if i % 2 else "completed", payment_amount=1.0,
+                ssh_username=f"user{i}"
+            ))
+        await db.commit()
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(jobs_display.router, prefix="/api/v1/display")
+    app.dependency_overrides[get_async_db] = override_get_db
+
+    # Every request must reach the database, not the response cache
+    response_cache._local.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    response_cache._local.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_active_jobs_query_count(client, assert_max_queries):
+    with assert_max_queries(3) as queries:
+        response = await client.get("/api/v1/display/active-jobs")
+    assert response.status_code == 200
+    assert queries.count >= 1  # The counter saw the request's statements
+    jobs = response.json()
+    assert len(jobs) == NODE_COUNT // 2
+    assert all(job["status"] == "running" for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_rental_nodes_query_count(client, assert_max_queries):
+    # One node query plus one current-jobs query per streamed batch
+    with assert_max_queries(3) as queries:
+        response = await client.get("/api/v1/display/rental-nodes")
+    assert queries.count >= 2
+    assert response.status_code == 200
+    nodes = response.json()
+    assert len(nodes) == NODE_COUNT
+    busy = [node for node in nodes if node["status"] == "busy"]
+    assert all(node["current_job"] and node["ssh_user"] for node in busy)
+
+
+@pytest.mark.asyncio
+async def test_job_stats_query_count(client, assert_max_queries):
+    with assert_max_queries(2) as queries:
+        response = await client.get("/api/v1/display/job-stats")
+    assert queries.count >= 1
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["jobs"] == {"total": NODE_COUNT, "active": NODE_COUNT // 2, "completed": NODE_COUNT - NODE_COUNT // 2}
+    assert stats["nodes"]["total"] == NODE_COUNT
@@ -0,0 +1,71 @@
+"""
+Unit tests for GPUMonitoringService health evaluation
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.services.monitoring import GPUMetrics, GPUMonitoringService
+
+
+def make_gpu(gpu_id="gpu_001", **overrides):
+    fields = dict(
+        gpu_id=gpu_id,
+        utilization=50.0,
+        temperature=60.0,
+        power_draw=300.0,
+        memory_used=8.0,
+        memory_total=24.0,
+        compute_power=83.0,
+        last_updated=datetime.now(),
+        is_rented=False,
+        current_subnet=None,
+    )
+    fields.update(overrides)
+    return GPUMetrics(**fields)
+
+
+@pytest.fixture
+def service():
+    return GPUMonitoringService()
+
+
+class TestGPUHealthStatus:
+    """Threshold handling in get_gpu_health_status"""
+
+    def test_unknown_gpu(self, service):
+        assert service.get_gpu_health_status("missing") == {"status": "unknown", "gpu_id": "missing"}
+
+    def test_healthy(self, service):
+        service._set_gpu(make_gpu())
+        health = service.get_gpu_health_status("gpu_001")
+        assert health["status"] == "healthy"
+        assert health["warnings"] == []
+
+    def test_high_temperature_is_warning(self, service):
+        service._set_gpu(make_gpu(temperature=87.0))
+        health = service.get_gpu_health_status("gpu_001")
+        assert health["status"] == "warning"
+        assert health["warnings"] == ["High temperature"]
+
+    def test_critical_temperature_is_critical(self, service):
+        service._set_gpu(make_gpu(temperature=95.0))
+        health = service.get_gpu_health_status("gpu_001")
+        assert health["status"] == "critical"
+        assert health["warnings"] == ["Critical temperature"]
+
+    def test_idle_rented_gpu_does_not_downgrade_critical(self, service):
+        service._set_gpu(make_gpu(temperature=95.0, utilization=0.0, is_rented=True, power_draw=450.0))
+        health = service.get_gpu_health_status("gpu_001")
+        assert health["status"] == "critical"
+        assert health["warnings"] == [
+            "Critical temperature",
+            "No utilization despite being rented",
+            "High power consumption",
+        ]
+
+    def test_health_counts_match_status(self, service):
+        for gpu_id, temperature in (("a", 60.0), ("b", 87.0), ("c", 95.0), ("d", 92.0)):
+            service._set_gpu(make_gpu(gpu_id, temperature=temperature))
+        assert service.get_gpu_health_counts() == {"healthy": 1, "warning": 1, "critical": 2}
@@ -33,6 +33,10 @@ SERVICES_DIR="$SCRIPT_DIR/.services"
 PID_DIR="$SERVICES_DIR/pids"
 LOG_DIR="$SERVICES_DIR/logs"
 
+# The API server runs multiple workers only when they can share state through Redis
+export REDIS_URL API_WORKERS
+API_SERVER_CMD="source /home/aloo/aloo/bin/activate && ./start_api_server.sh"
+
 print_status() {
     echo -e "${GREEN}[${CHECKMARK}]${NC} $1"
 }
@@ -175,7 +179,7 @@ start_all_services() {
     
     # 2. Start API server
     start_service "api-server" \
-        "source /home/aloo/aloo/bin/activate && python api_server.py" \
+        "$API_SERVER_CMD" \
         "$SCRIPT_DIR/backend"
     
     # 3. Start web interface
@@ -273,7 +277,7 @@ restart_service() {
     case "$service_name" in
         "api-server")
             start_service "api-server" \
-                "source /home/aloo/aloo/bin/activate && python api_server.py" \
+                "$API_SERVER_CMD" \
                 "$SCRIPT_DIR/backend"
             ;;
         "web-dev")